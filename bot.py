@@ -3,7 +3,12 @@ import sqlite3
 import json
 import time
 import re
-from typing import List, Optional, Dict, Any
+import random
+import hashlib
+import queue
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Iterator, Callable, Tuple, TypeVar, Set, Coroutine
 import logging
 
 import discord
@@ -11,35 +16,63 @@ from discord import app_commands
 from discord.ext import commands
 import asyncio
 
-# Global/per-guild helpers for rate-limit aware operations
-_CREATE_LOCKS: Dict[int, asyncio.Lock] = {}
+T = TypeVar("T")
 
+# Global/per-guild helpers for rate-limit aware operations.
+# Channel creations in a guild share one Discord bucket; space them out by reserving
+# start slots (loop time) instead of holding a lock across the HTTP call.
+CHANNEL_CREATE_INTERVAL = 0.5
+_CREATE_SLOTS: Dict[int, float] = {}
+# In-memory anti-spam dicts are swept of stale entries once they reach this size
+_SWEEP_THRESHOLD = 10_000
 
-def _get_create_lock(guild_id: int) -> asyncio.Lock:
-    lock = _CREATE_LOCKS.get(guild_id)
-    if lock is None:
-        lock = asyncio.Lock()
-        _CREATE_LOCKS[guild_id] = lock
-    return lock
+
+def _reserve_create_slot(guild_id: int) -> float:
+    """Returns how long to wait before creating a channel in this guild."""
+    now = asyncio.get_running_loop().time()
+    start = max(now, _CREATE_SLOTS.get(guild_id, 0.0))
+    _CREATE_SLOTS[guild_id] = start + CHANNEL_CREATE_INTERVAL
+    return start - now
 
 
 DB_PATH = os.getenv("DB_PATH", os.path.join("data", "bot.sqlite"))
 TOKEN = os.getenv("DISCORD_TOKEN", "")
 GUILD_ID_ENV = os.getenv("GUILD_ID")
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
 
 # Default panel content (env overrides used if DB values are missing)
 ENV_CONTACT_NAME = os.getenv("SUPPORT_CONTACT_NAME")
 ENV_PANEL_TITLE = os.getenv("PANEL_TITLE")
 ENV_PANEL_DESCRIPTION = os.getenv("PANEL_DESCRIPTION")
+_ENV_DEFAULTS = {
+    k: v
+    for k, v in (
+        ("contact_name", ENV_CONTACT_NAME),
+        ("panel_title", ENV_PANEL_TITLE),
+        ("panel_description", ENV_PANEL_DESCRIPTION),
+    )
+    if v
+}
 
 # App-level anti-spam gates (keep simple, in-memory)
 OPEN_TICKET_GATE_SECONDS = int(os.getenv("OPEN_TICKET_GATE_SECONDS", "5"))
 TICKET_OPEN_COOLDOWN_SECONDS = int(os.getenv("TICKET_OPEN_COOLDOWN_SECONDS", "60"))
 OPEN_TICKETS_PER_USER_LIMIT = int(os.getenv("OPEN_TICKETS_PER_USER_LIMIT", "1"))
 
+# Ticket-channel messages are logged in batches (one executemany + commit per flush)
+MESSAGE_LOG_BATCH_SIZE = int(os.getenv("MESSAGE_LOG_BATCH_SIZE", "50"))
+MESSAGE_LOG_FLUSH_SECONDS = float(os.getenv("MESSAGE_LOG_FLUSH_SECONDS", "1.0"))
+
 _OPEN_GATES: Dict[str, float] = {}
 _USER_CATEGORY_COOLDOWNS: Dict[str, float] = {}
 
+
+def _sweep_expired(d: Dict[str, float], now: float):
+    """Drop expired gate/cooldown entries once the dict grows past _SWEEP_THRESHOLD."""
+    if len(d) >= _SWEEP_THRESHOLD:
+        for k in [k for k, exp in d.items() if exp <= now]:
+            del d[k]
+
 def _gate_key(guild_id: int, user_id: int) -> str:
     return f"{guild_id}:{user_id}"
 
@@ -53,13 +86,161 @@ def ensure_data_dir():
         os.makedirs(d, exist_ok=True)
 
 
+# Long-lived connections reused across handlers (keeps SQLite's page cache warm).
+# SQLite admits one writer at a time, so the write pool stays small; lookups use a
+# separate query_only pool that in WAL mode never queues behind a writer.
+DB_POOL_SIZE = 2
+DB_READ_POOL_SIZE = 8
+DB_STATEMENT_CACHE_SIZE = 256
+_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+_READ_POOL: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=DB_READ_POOL_SIZE)
+
+# Hot-path SQL, shared by every call site so each pooled connection compiles them once
+# (columns are listed explicitly; only what callers read is fetched)
+_SQL_CONFIG_BY_GUILD = (
+    "SELECT support_channel_id, ticket_category_id, staff_role_id, panel_title, panel_description, "
+    "contact_name, allow_user_close FROM config WHERE guild_id = ?"
+)
+_SQL_CATEGORIES_BY_GUILD = "SELECT id, name, placeholder FROM categories WHERE guild_id = ? AND active = 1 ORDER BY id ASC"
+_SQL_CATEGORY_BY_ID = "SELECT id, name, placeholder FROM categories WHERE id = ?"
+_SQL_FIELDS_BY_CATEGORY = (
+    "SELECT id, name, label, required, style, min_length, max_length FROM fields "
+    "WHERE category_id = ? ORDER BY order_index ASC, id ASC"
+)
+# 'pending' rows (channel still being created) are left out of the counts; keeping the
+# status != 'closed' term verbatim lets SQLite use the partial idx_tickets_open
+_SQL_COUNT_OPEN_BY_GUILD = (
+    "SELECT COUNT(1) FROM tickets WHERE guild_id = ? AND status != 'closed' AND status != 'pending'"
+)
+# Stops walking idx_tickets_open after `limit` rows; the cap only needs to know if it was reached
+_SQL_COUNT_OPEN_BY_OPENER = (
+    "SELECT COUNT(1) FROM (SELECT 1 FROM tickets WHERE guild_id = ? AND opener_id = ? "
+    "AND status != 'closed' AND status != 'pending' LIMIT ?)"
+)
+_SQL_OPEN_CHANNELS_BY_GUILD = (
+    "SELECT id, channel_id FROM tickets WHERE guild_id = ? AND status != 'closed' AND channel_id IS NOT NULL"
+)
+_SQL_TICKET_BY_CHANNEL = "SELECT id, opener_id, status, priority, first_message_id FROM tickets WHERE channel_id = ?"
+_SQL_OPEN_TICKET_CHANNELS = "SELECT channel_id, id, status FROM tickets WHERE status != 'closed' AND channel_id IS NOT NULL"
+_SQL_SET_TICKET_PRIORITY = "UPDATE tickets SET priority = ? WHERE id = ?"
+# Params: channel_id, caller_is_staff (0/1), caller_id. Returns nothing if not allowed/closed/missing.
+_SQL_MARK_PENDING_CLOSE = (
+    "UPDATE tickets SET status = 'pending_close' "
+    "WHERE channel_id = ? AND status != 'closed' AND (? OR opener_id = ?) "
+    "RETURNING id, first_message_id"
+)
+_SQL_CLOSE_TICKET = (
+    "UPDATE tickets SET status = 'closed', closed_at = ?, admin_closer_id = ? "
+    "WHERE id = ? AND status != 'closed' RETURNING channel_id"
+)
+# Compact JSON for logged content/attachments; most messages have no attachments
+_JSON_SEPARATORS = (",", ":")
+_EMPTY_JSON_LIST = "[]"
+_SQL_INSERT_MESSAGE = (
+    "INSERT INTO messages(ticket_id, discord_message_id, author_id, content, attachments_json, created_at) "
+    "VALUES (?,?,?,?,?,?)"
+)
+
+
 def get_conn() -> sqlite3.Connection:
+    """Check out a pooled connection, opening a new one if the pool is empty.
+    Pair with put_conn(), or use pooled_conn() instead.
+    """
+    try:
+        return _POOL.get_nowait()
+    except queue.Empty:
+        return _open_conn()
+
+
+def _open_conn(read_only: bool = False) -> sqlite3.Connection:
     ensure_data_dir()
-    conn = sqlite3.connect(DB_PATH)
+    # timeout= is SQLite's busy timeout: wait up to 5s on a locked database instead of failing
+    conn = sqlite3.connect(DB_PATH, timeout=5.0, check_same_thread=False, cached_statements=DB_STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
+    # Per-connection tuning; journal_mode=WAL is persisted in the file by init_db()
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
     return conn
 
 
+def put_conn(conn: sqlite3.Connection, pool: "queue.LifoQueue[sqlite3.Connection]" = _POOL):
+    """Return a connection to its pool. Uncommitted work is rolled back, as close() would."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        pool.put_nowait(conn)
+    except (queue.Full, sqlite3.Error):
+        conn.close()
+
+
+def warm_pool():
+    """Open the pool's connections up front so the first events after startup don't pay connect/PRAGMA cost."""
+    for _ in range(DB_POOL_SIZE - _POOL.qsize()):
+        put_conn(_open_conn())
+    for _ in range(DB_READ_POOL_SIZE - _READ_POOL.qsize()):
+        put_conn(_open_conn(read_only=True), _READ_POOL)
+
+
+@contextmanager
+def pooled_conn() -> Iterator[sqlite3.Connection]:
+    conn = get_conn()
+    try:
+        yield conn
+    finally:
+        put_conn(conn)
+
+
+@contextmanager
+def pooled_read_conn() -> Iterator[sqlite3.Connection]:
+    """Like pooled_conn(), but from the query_only pool; use for lookups that never write."""
+    try:
+        conn = _READ_POOL.get_nowait()
+    except queue.Empty:
+        conn = _open_conn(read_only=True)
+    try:
+        yield conn
+    finally:
+        put_conn(conn, _READ_POOL)
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking DB helper in a worker thread so the event loop keeps dispatching
+    gateway events while SQLite waits on locks or fsync. Pooled connections are
+    opened with check_same_thread=False, so any worker can use them.
+    """
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+# The event loop only keeps weak references to tasks, so fire-and-forget work is held here until done
+_BACKGROUND_TASKS: Set["asyncio.Task[Any]"] = set()
+
+
+def spawn_background(coro: Coroutine[Any, Any, Any]) -> "asyncio.Task[Any]":
+    """create_task() for follow-up work nobody awaits, kept alive until it finishes."""
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
+
+
+# channel_id -> (name, topic) from our last successful edit. ch.name/ch.topic only change when
+# the gateway's CHANNEL_UPDATE arrives, so until then the cached channel still shows the old values.
+_LAST_CHANNEL_EDIT: Dict[int, Tuple[str, Optional[str]]] = {}
+
+
+def _edit_is_noop(ch: discord.TextChannel, attr: str, value: str) -> bool:
+    """True only if both the channel cache and our last write (if any) already hold `value`."""
+    last = _LAST_CHANNEL_EDIT.get(ch.id)
+    if last is not None and value != (last[0] if attr == "name" else last[1]):
+        return False
+    return value == getattr(ch, attr)
+
+
 async def try_edit_channel(
     ch: discord.TextChannel,
     *,
@@ -68,26 +249,57 @@ async def try_edit_channel(
     overwrites: Optional[Dict[Any, Any]] = None,
     reason: Optional[str] = None,
     timeout: float = 3.0,
+    force: bool = False,
 ) -> bool:
     """Attempt a channel edit but bail out quickly if rate-limited.
+    A short Retry-After (up to min(2 * timeout, 5s)) is waited out once with a little jitter.
+    Unless force=True, fields already at the requested value are dropped; if nothing is left,
+    no request is made.
     Returns True on success, False on timeout or HTTP error.
     """
-    try:
-        kwargs: Dict[str, Any] = {}
-        if name is not None:
-            kwargs["name"] = name
-        if topic is not None:
-            kwargs["topic"] = topic
-        if overwrites is not None:
-            kwargs["overwrites"] = overwrites
-        if reason is not None:
-            kwargs["reason"] = reason
-        await asyncio.wait_for(ch.edit(**kwargs), timeout=timeout)
+    last = _LAST_CHANNEL_EDIT.get(ch.id)
+    if last is not None and last == (ch.name, ch.topic):
+        # The gateway has caught up with our last write; the cache alone is authoritative again
+        del _LAST_CHANNEL_EDIT[ch.id]
+    kwargs: Dict[str, Any] = {}
+    if name is not None and (force or not _edit_is_noop(ch, "name", name)):
+        kwargs["name"] = name
+    if topic is not None and (force or not _edit_is_noop(ch, "topic", topic)):
+        kwargs["topic"] = topic
+    if overwrites is not None:
+        kwargs["overwrites"] = overwrites
+    if not kwargs:
         return True
-    except (asyncio.TimeoutError, discord.HTTPException, discord.errors.RateLimited):
-        return False
-    except Exception:
-        return False
+    if reason is not None:
+        kwargs["reason"] = reason
+    for attempt in range(2):
+        try:
+            edited = await asyncio.wait_for(ch.edit(**kwargs), timeout=timeout)
+            if "name" in kwargs or "topic" in kwargs:
+                # edit() returns a fresh channel and leaves `ch` untouched; remember what was written
+                src = edited if isinstance(edited, discord.TextChannel) else None
+                if len(_LAST_CHANNEL_EDIT) >= _SWEEP_THRESHOLD:
+                    _LAST_CHANNEL_EDIT.clear()
+                _LAST_CHANNEL_EDIT[ch.id] = (
+                    src.name if src else kwargs.get("name", ch.name),
+                    src.topic if src else kwargs.get("topic", ch.topic),
+                )
+            return True
+        except discord.errors.RateLimited as e:
+            retry_after = float(e.retry_after)
+        except discord.HTTPException as e:
+            if e.status != 429:
+                return False
+            try:
+                retry_after = float(e.response.headers.get("Retry-After"))  # type: ignore[union-attr]
+            except (AttributeError, TypeError, ValueError):
+                return False
+        except Exception:
+            return False
+        if attempt or retry_after > min(timeout * 2, 5.0):
+            return False
+        await asyncio.sleep(retry_after + random.uniform(0, 0.25))
+    return False
 
 
 async def safe_create_text_channel(
@@ -101,250 +313,397 @@ async def safe_create_text_channel(
 ) -> discord.TextChannel:
     """Create a text channel while handling rate limits robustly.
 
-    - Serialises creation per-guild via a lock to avoid burst hitting the same bucket.
+    - Paces creation per-guild (CHANNEL_CREATE_INTERVAL apart) to avoid bursts hitting the same bucket;
+      concurrent requests wait for their slot but never on each other's HTTP round-trip.
     - Propagates discord.errors.RateLimited so callers can inform the user.
     """
-    async with _get_create_lock(guild.id):
-        try:
-            return await guild.create_text_channel(
-                name,
-                category=category,
-                overwrites=overwrites,
-                topic=topic,
-                reason=reason,
-            )
-        except discord.errors.RateLimited:
-            raise
+    delay = _reserve_create_slot(guild.id)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    try:
+        return await guild.create_text_channel(
+            name,
+            category=category,
+            overwrites=overwrites,
+            topic=topic,
+            reason=reason,
+        )
+    except discord.errors.RateLimited:
+        raise
+
+
+# Bump when changing _SCHEMA_SQL or adding a migration step to init_db();
+# databases already at this version skip schema setup entirely on startup
+SCHEMA_VERSION = 3
+
+_SCHEMA_SQL = """
+-- guild-wide configuration
+CREATE TABLE IF NOT EXISTS config (
+    guild_id INTEGER PRIMARY KEY,
+    support_channel_id INTEGER,
+    ticket_category_id INTEGER,
+    staff_role_id INTEGER,
+    panel_title TEXT,
+    panel_description TEXT,
+    contact_name TEXT,
+    allow_user_close INTEGER DEFAULT 1
+);
+
+-- categories configured by admin
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    placeholder TEXT,
+    active INTEGER DEFAULT 1
+);
+-- (guild_id, active, id) serves list_categories' filter and ORDER BY without a sort step
+DROP INDEX IF EXISTS idx_categories_guild;
+CREATE INDEX IF NOT EXISTS idx_categories_guild_active ON categories(guild_id, active, id);
+
+-- fields per category (for the modal)
+CREATE TABLE IF NOT EXISTS fields (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    label TEXT NOT NULL,
+    required INTEGER DEFAULT 1,
+    style TEXT DEFAULT 'short', -- 'short' | 'paragraph'
+    min_length INTEGER,
+    max_length INTEGER,
+    order_index INTEGER DEFAULT 0
+);
+DROP INDEX IF EXISTS idx_fields_cat;
+CREATE INDEX IF NOT EXISTS idx_fields_cat_order ON fields(category_id, order_index, id);
+
+-- per-guild ticket number counter
+CREATE TABLE IF NOT EXISTS guild_counters (
+    guild_id INTEGER PRIMARY KEY,
+    next_ticket_number INTEGER DEFAULT 1
+);
+
+-- tickets and messages
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_number INTEGER,
+    guild_id INTEGER NOT NULL,
+    opener_id INTEGER NOT NULL,
+    channel_id INTEGER,
+    category_id INTEGER,
+    status TEXT NOT NULL,
+    priority TEXT DEFAULT 'Low',
+    created_at INTEGER,
+    closed_at INTEGER,
+    admin_closer_id INTEGER,
+    first_message_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_guild ON tickets(guild_id);
+-- Partial index over open tickets only: the per-guild/per-opener counts never touch closed rows
+CREATE INDEX IF NOT EXISTS idx_tickets_open ON tickets(guild_id, opener_id) WHERE status != 'closed';
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id INTEGER NOT NULL,
+    discord_message_id INTEGER,
+    author_id INTEGER,
+    content TEXT,
+    attachments_json TEXT,
+    created_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_ticket ON messages(ticket_id);
+
+-- small key/value store for bot bookkeeping (e.g. last synced command tree)
+CREATE TABLE IF NOT EXISTS bot_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+-- roles allowed to access tickets (in addition to staff_role)
+-- access_roles table removed in favor of a single staff role model
+"""
 
 
 def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
-    # guild-wide configuration
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS config (
-            guild_id INTEGER PRIMARY KEY,
-            support_channel_id INTEGER,
-            ticket_category_id INTEGER,
-            staff_role_id INTEGER,
-            panel_title TEXT,
-            panel_description TEXT,
-            contact_name TEXT,
-            allow_user_close INTEGER DEFAULT 1
-        )
-        """
-    )
-    # categories configured by admin
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            placeholder TEXT,
-            active INTEGER DEFAULT 1
-        )
-        """
-    )
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_categories_guild ON categories(guild_id)")
-
-    # fields per category (for the modal)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS fields (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            category_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            label TEXT NOT NULL,
-            required INTEGER DEFAULT 1,
-            style TEXT DEFAULT 'short', -- 'short' | 'paragraph'
-            min_length INTEGER,
-            max_length INTEGER,
-            order_index INTEGER DEFAULT 0
-        )
-        """
-    )
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_fields_cat ON fields(category_id)")
-
-    # per-guild ticket number counter
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS guild_counters (
-            guild_id INTEGER PRIMARY KEY,
-            next_ticket_number INTEGER DEFAULT 1
-        )
-        """
-    )
+    with pooled_conn() as conn:
+        cur = conn.cursor()
+        # WAL lets ticket-channel logging and interaction reads proceed concurrently
+        if DB_PATH != ":memory:":
+            cur.execute("PRAGMA journal_mode=WAL")
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        cur.executescript(_SCHEMA_SQL)
+        # Lightweight migrations for newly added columns; user_version records that they ran
+        try:
+            if version < 1:
+                cur.execute("PRAGMA table_info(tickets)")
+                cols = {r[1] for r in cur.fetchall()}
+                if "priority" not in cols:
+                    cur.execute("ALTER TABLE tickets ADD COLUMN priority TEXT DEFAULT 'Low'")
+                if "first_message_id" not in cols:
+                    cur.execute("ALTER TABLE tickets ADD COLUMN first_message_id INTEGER")
+            if version < 2:
+                # One ticket per channel; a unique index lets channel lookups stop at the first hit
+                try:
+                    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_channel_id ON tickets(channel_id)")
+                    cur.execute("DROP INDEX IF EXISTS idx_tickets_channel")
+                except sqlite3.IntegrityError:
+                    # Legacy duplicate rows; keep the plain index
+                    cur.execute("CREATE INDEX IF NOT EXISTS idx_tickets_channel ON tickets(channel_id)")
+            if version < 3:
+                # Placeholders double as select-option descriptions (max 100 chars); add_category now stores them that way
+                cur.execute("UPDATE categories SET placeholder = substr(COALESCE(placeholder, ''), 1, 100)")
+            cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            pass
 
-    # tickets and messages
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS tickets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ticket_number INTEGER,
-            guild_id INTEGER NOT NULL,
-            opener_id INTEGER NOT NULL,
-            channel_id INTEGER,
-            category_id INTEGER,
-            status TEXT NOT NULL,
-            priority TEXT DEFAULT 'Low',
-            created_at INTEGER,
-            closed_at INTEGER,
-            admin_closer_id INTEGER,
-            first_message_id INTEGER
-        )
-        """
-    )
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_tickets_channel ON tickets(channel_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_tickets_guild ON tickets(guild_id)")
-
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ticket_id INTEGER NOT NULL,
-            discord_message_id INTEGER,
-            author_id INTEGER,
-            content TEXT,
-            attachments_json TEXT,
-            created_at INTEGER
-        )
-        """
-    )
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_messages_ticket ON messages(ticket_id)")
 
-    # roles allowed to access tickets (in addition to staff_role)
-    # access_roles table removed in favor of a single staff role model
+# In-process caches for read-mostly admin configuration. Rows only change through
+# /admin commands, which drop the affected entries after writing.
+_CONFIG_CACHE: Dict[int, Dict[str, Any]] = {}
+_CATEGORIES_CACHE: Dict[int, List[Dict[str, Any]]] = {}
+_FIELDS_CACHE: Dict[int, List[Dict[str, Any]]] = {}
+_CATEGORIES_BY_ID: Dict[int, Dict[str, Any]] = {}
+_PANEL_OPTIONS_CACHE: Dict[int, List[discord.SelectOption]] = {}
+# guild_id -> shared persistent PanelView (timeout=None), reused for every panel post/reset
+_PANEL_VIEW_CACHE: Dict[int, "PanelView"] = {}
+# Cache fills run in worker threads and can race a write: a fill that read the DB before a
+# commit must not store after the invalidation. Writers bump (scope, key) after committing and
+# drop the entry; fills note the generation before reading and store only if it is unchanged.
+# Both sides do that under _CACHE_LOCK.
+_CACHE_LOCK = threading.Lock()
+_CACHE_GENERATIONS: Dict[Tuple[str, int], int] = {}
+
+
+def cache_generation(scope: str, key: int) -> int:
+    return _CACHE_GENERATIONS.get((scope, key), 0)
+
+
+def _bump_generation(scope: str, key: int):
+    """Caller holds _CACHE_LOCK."""
+    _CACHE_GENERATIONS[(scope, key)] = _CACHE_GENERATIONS.get((scope, key), 0) + 1
 
-    conn.commit()
-    # Lightweight migrations for newly added columns
-    try:
-        cur.execute("PRAGMA table_info(tickets)")
-        cols = {r[1] for r in cur.fetchall()}
-        if "priority" not in cols:
-            cur.execute("ALTER TABLE tickets ADD COLUMN priority TEXT DEFAULT 'Low'")
-        if "first_message_id" not in cols:
-            cur.execute("ALTER TABLE tickets ADD COLUMN first_message_id INTEGER")
-        conn.commit()
-    except Exception:
-        pass
-    conn.close()
+
+def invalidate_config(guild_id: int):
+    with _CACHE_LOCK:
+        _bump_generation("config", guild_id)
+        _CONFIG_CACHE.pop(guild_id, None)
+
+
+def invalidate_fields(cat_id: int):
+    with _CACHE_LOCK:
+        _bump_generation("fields", cat_id)
+        _FIELDS_CACHE.pop(cat_id, None)
+
+
+def invalidate_categories(guild_id: int):
+    with _CACHE_LOCK:
+        _bump_generation("categories", guild_id)
+        # _CATEGORIES_BY_ID is not keyed by guild, so it is cleared (and guarded) as a whole
+        _bump_generation("category_ids", 0)
+        _CATEGORIES_CACHE.pop(guild_id, None)
+        _PANEL_OPTIONS_CACHE.pop(guild_id, None)
+        _PANEL_VIEW_CACHE.pop(guild_id, None)
+        _CATEGORIES_BY_ID.clear()
 
 
 def upsert_config(guild_id: int, **kwargs):
-    conn = get_conn()
-    cur = conn.cursor()
-    # Ensure row exists
-    cur.execute("INSERT OR IGNORE INTO config(guild_id) VALUES (?)", (guild_id,))
-    # Build dynamic update
-    keys = []
-    vals = []
-    for k, v in kwargs.items():
-        keys.append(f"{k} = ?")
-        vals.append(v)
-    if keys:
-        vals.append(guild_id)
-        cur.execute(f"UPDATE config SET {', '.join(keys)} WHERE guild_id = ?", vals)
-    conn.commit()
-    conn.close()
+    # One statement: create the row or update the given columns (names come from callers, not users)
+    cols = list(kwargs)
+    sql = f"INSERT INTO config(guild_id{''.join(', ' + c for c in cols)}) VALUES ({', '.join('?' * (len(cols) + 1))}) "
+    if cols:
+        sql += f"ON CONFLICT(guild_id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in cols)}"
+    else:
+        sql += "ON CONFLICT(guild_id) DO NOTHING"
+    with pooled_conn() as conn:
+        conn.execute(sql, (guild_id, *kwargs.values()))
+        conn.commit()
+    invalidate_config(guild_id)
 
 
 def get_config(guild_id: int) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM config WHERE guild_id = ?", (guild_id,))
-    row = cur.fetchone()
-    conn.close()
+    cached = _CONFIG_CACHE.get(guild_id)
+    if cached is not None:
+        return dict(cached)
+    gen = cache_generation("config", guild_id)
+    with pooled_read_conn() as conn:
+        row = tuple_cursor(conn).execute(_SQL_CONFIG_BY_GUILD, (guild_id,)).fetchone()
+    # Column order matches _SQL_CONFIG_BY_GUILD
+    sc, tc, sr, pt, pd, cn, auc = row if row else (None, None, None, None, None, None, 1)
     cfg = {
-        "support_channel_id": None,
-        "ticket_category_id": None,
-        "staff_role_id": None,
-        "panel_title": None,
-        "panel_description": None,
-        "contact_name": None,
-        "allow_user_close": 1,
+        "support_channel_id": sc,
+        "ticket_category_id": tc,
+        "staff_role_id": sr,
+        "panel_title": pt,
+        "panel_description": pd,
+        "contact_name": cn,
+        "allow_user_close": auc,
     }
-    if row:
-        cfg.update(dict(row))
     # Apply ENV defaults if DB value is missing
-    if not cfg.get("contact_name") and ENV_CONTACT_NAME:
-        cfg["contact_name"] = ENV_CONTACT_NAME
-    if not cfg.get("panel_title") and ENV_PANEL_TITLE:
-        cfg["panel_title"] = ENV_PANEL_TITLE
-    if not cfg.get("panel_description") and ENV_PANEL_DESCRIPTION:
-        cfg["panel_description"] = ENV_PANEL_DESCRIPTION
-    return cfg
+    for k, v in _ENV_DEFAULTS.items():
+        if not cfg.get(k):
+            cfg[k] = v
+    with _CACHE_LOCK:
+        if cache_generation("config", guild_id) == gen:
+            _CONFIG_CACHE[guild_id] = cfg
+    return dict(cfg)
+
+
+async def get_config_async(guild_id: int) -> Dict[str, Any]:
+    """get_config for coroutines: cache hits stay on the loop, misses load in a worker thread."""
+    cached = _CONFIG_CACHE.get(guild_id)
+    if cached is not None:
+        return dict(cached)
+    return await run_db(get_config, guild_id)
 
 # No server-side cooldown; we only persist after successful channel edits
 
 
-def list_categories(guild_id: int) -> List[sqlite3.Row]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM categories WHERE guild_id = ? AND active = 1 ORDER BY id ASC",
-        (guild_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
+def list_categories(guild_id: int) -> List[Dict[str, Any]]:
+    cached = _CATEGORIES_CACHE.get(guild_id)
+    if cached is not None:
+        return cached
+    gen = cache_generation("categories", guild_id)
+    ids_gen = cache_generation("category_ids", 0)
+    with pooled_read_conn() as conn:
+        rows = [dict(r) for r in conn.execute(_SQL_CATEGORIES_BY_GUILD, (guild_id,))]
+    with _CACHE_LOCK:
+        if cache_generation("categories", guild_id) == gen:
+            _CATEGORIES_CACHE[guild_id] = rows
+        if cache_generation("category_ids", 0) == ids_gen:
+            for r in rows:
+                _CATEGORIES_BY_ID[r["id"]] = r
     return rows
 
 
-def get_category_by_id(cat_id: int) -> Optional[sqlite3.Row]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM categories WHERE id = ?", (cat_id,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+def get_category_by_id(cat_id: int) -> Optional[Dict[str, Any]]:
+    cached = _CATEGORIES_BY_ID.get(cat_id)
+    if cached is not None:
+        return cached
+    gen = cache_generation("category_ids", 0)
+    with pooled_read_conn() as conn:
+        row = conn.execute(_SQL_CATEGORY_BY_ID, (cat_id,)).fetchone()
+    if row is None:
+        return None
+    category = dict(row)
+    with _CACHE_LOCK:
+        if cache_generation("category_ids", 0) == gen:
+            _CATEGORIES_BY_ID[cat_id] = category
+    return category
+
+
+def panel_options(guild_id: int) -> List[discord.SelectOption]:
+    """Panel select options for a guild's categories (max 25), built once per category change."""
+    cached = _PANEL_OPTIONS_CACHE.get(guild_id)
+    if cached is None:
+        gen = cache_generation("categories", guild_id)
+        cached = [
+            discord.SelectOption(
+                label=c["name"],
+                description=c["placeholder"],
+                value=f"cat:{c['id']}",
+            )
+            for c in list_categories(guild_id)[:25]
+        ]
+        with _CACHE_LOCK:
+            if cache_generation("categories", guild_id) == gen:
+                _PANEL_OPTIONS_CACHE[guild_id] = cached
+    return list(cached)
+
+
+def get_fields_for_category(cat_id: int) -> List[Dict[str, Any]]:
+    cached = _FIELDS_CACHE.get(cat_id)
+    if cached is not None:
+        return cached
+    gen = cache_generation("fields", cat_id)
+    with pooled_read_conn() as conn:
+        rows = [dict(r) for r in conn.execute(_SQL_FIELDS_BY_CATEGORY, (cat_id,))]
+    with _CACHE_LOCK:
+        if cache_generation("fields", cat_id) == gen:
+            _FIELDS_CACHE[cat_id] = rows
+    return rows
 
 
-def get_fields_for_category(cat_id: int) -> List[sqlite3.Row]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM fields WHERE category_id = ? ORDER BY order_index ASC, id ASC",
-        (cat_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def get_fields_for_categories(cat_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """get_fields_for_category for several categories; uncached ones are loaded with one query."""
+    out = {cid: _FIELDS_CACHE[cid] for cid in cat_ids if cid in _FIELDS_CACHE}
+    missing = [cid for cid in cat_ids if cid not in out]
+    if missing:
+        loaded: Dict[int, List[Dict[str, Any]]] = {cid: [] for cid in missing}
+        gens = {cid: cache_generation("fields", cid) for cid in missing}
+        with pooled_read_conn() as conn:
+            rows = conn.execute(
+                "SELECT category_id, id, name, label, required, style, min_length, max_length FROM fields "
+                f"WHERE category_id IN ({','.join('?' * len(missing))}) ORDER BY category_id, order_index ASC, id ASC",
+                missing,
+            ).fetchall()
+        for r in rows:
+            f = dict(r)
+            loaded[f.pop("category_id")].append(f)
+        with _CACHE_LOCK:
+            for cid, fields in loaded.items():
+                if cache_generation("fields", cid) == gens[cid]:
+                    _FIELDS_CACHE[cid] = fields
+        out.update(loaded)
+    return out
+
+
+def insert_fields(cat_id: int, rows: List[Tuple[str, str, int, str]]):
+    """Insert (name, label, required, style) modal fields for one category.
+    All rows share one prepared statement and one commit.
+    """
+    with pooled_conn() as conn:
+        conn.executemany(
+            "INSERT INTO fields(category_id, name, label, required, style) VALUES (?,?,?,?,?)",
+            [(cat_id, *r) for r in rows],
+        )
+        conn.commit()
+    invalidate_fields(cat_id)
 
 
-def get_or_init_counter(guild_id: int) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT OR IGNORE INTO guild_counters(guild_id, next_ticket_number) VALUES (?,1)",
-        (guild_id,),
-    )
-    cur.execute(
-        "SELECT next_ticket_number FROM guild_counters WHERE guild_id = ?",
-        (guild_id,),
-    )
-    row = cur.fetchone()
-    next_num = int(row[0]) if row else 1
-    conn.close()
-    return next_num
+def delete_fields(cat_id: int, field_names: List[str]):
+    """Remove several fields of one category with a single DELETE."""
+    with pooled_conn() as conn:
+        conn.execute(
+            f"DELETE FROM fields WHERE category_id = ? AND name IN ({','.join('?' * len(field_names))})",
+            (cat_id, *field_names),
+        )
+        conn.commit()
+    invalidate_fields(cat_id)
 
 
-def increment_counter(guild_id: int):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE guild_counters SET next_ticket_number = next_ticket_number + 1 WHERE guild_id = ?",
-        (guild_id,),
-    )
-    conn.commit()
-    conn.close()
+def find_category_id(guild_id: int, name: str) -> Optional[int]:
+    with pooled_read_conn() as conn:
+        row = conn.execute("SELECT id FROM categories WHERE guild_id = ? AND name = ?", (guild_id, name)).fetchone()
+    return int(row[0]) if row else None
+
+
+def insert_category(guild_id: int, name: str, placeholder: Optional[str]):
+    with pooled_conn() as conn:
+        conn.execute(
+            "INSERT INTO categories(guild_id, name, placeholder, active) VALUES (?,?,?,1)",
+            (guild_id, name, (placeholder or "")[:100]),
+        )
+        conn.commit()
+    invalidate_categories(guild_id)
+
+
+def delete_category(guild_id: int, name: str):
+    with pooled_conn() as conn:
+        conn.execute("DELETE FROM categories WHERE guild_id = ? AND name = ?", (guild_id, name))
+        conn.commit()
+    invalidate_categories(guild_id)
+
+
+_RE_NONSLUG = re.compile(r"[^a-z0-9-]")
+_RE_DASHES = re.compile(r"-+")
 
 
 def slugify_username(name: str) -> str:
-    s = name.lower()
-    s = re.sub(r"[^a-z0-9-]", "-", s)
-    s = re.sub(r"-+", "-", s).strip("-")
-    return s[:50] if s else "user"
+    s = _RE_NONSLUG.sub("-", name.lower())
+    s = _RE_DASHES.sub("-", s).strip("-")
+    return s[:50] or "user"
 
 
 def is_admin(member: discord.Member) -> bool:
@@ -365,41 +724,196 @@ def is_admin(member: discord.Member) -> bool:
 
 def is_staff(member: discord.Member, guild_cfg: Dict[str, Any]) -> bool:
     staff_role_id = guild_cfg.get("staff_role_id")
-    if staff_role_id:
-        role = discord.utils.get(member.roles, id=int(staff_role_id))
-        if role is not None:
-            return True
-    return False
+    # Member.get_role bisects the member's sorted role ids instead of walking member.roles
+    return bool(staff_role_id) and member.get_role(int(staff_role_id)) is not None
+
+
+async def is_admin_or_staff(member: discord.Member, guild_id: int) -> bool:
+    # Admin permissions need no DB/config lookup; only fall back to the staff role check
+    if is_admin(member):
+        return True
+    return is_staff(member, await get_config_async(guild_id))
+
+
+_STATUS_PREFIXES = frozenset(("⚪", "🟡", "🟠", "🔴", "🟢"))
+
+
+def strip_status_prefix(name: str) -> str:
+    """Drop a leading "<status emoji>-" from a ticket channel name (each emoji is one code point)."""
+    return name[2:] if name[:1] in _STATUS_PREFIXES and name[1:2] == "-" else name
+
+
+_PRIORITY_EMOJI = {"low": "⚪", "high": "🟠", "urgent": "🔴"}
 
 
 def priority_emoji(priority: str) -> str:
-    p = (priority or "").lower()
-    if p == "low":
-        return "⚪"
-    if p == "high":
-        return "🟠"
-    if p == "urgent":
-        return "🔴"
     # Normal/default
-    return "🟡"
+    return _PRIORITY_EMOJI.get((priority or "").lower(), "🟡")
 
 
 def reserve_open_ticket_number(guild_id: int) -> int:
-    """Returns the next open-queue number (count of open tickets + 1) under a write lock.
-    This avoids duplicate numbers when multiple users create tickets at the same time.
+    """Returns the next open-queue number (count of open tickets + 1).
+    The count is answered from the partial idx_tickets_open index, so it only touches open
+    tickets. Like the channel name it feeds, it is a display number, not a unique key.
     """
-    conn = get_conn()
+    with pooled_read_conn() as conn:
+        row = conn.execute(_SQL_COUNT_OPEN_BY_GUILD, (guild_id,)).fetchone()
+    return (int(row[0]) if row else 0) + 1
+
+
+def tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Cursor returning plain tuples; hot paths unpack positionally instead of via sqlite3.Row."""
     cur = conn.cursor()
-    try:
-        cur.execute("BEGIN IMMEDIATE")
-        cur.execute("SELECT COUNT(1) FROM tickets WHERE guild_id = ? AND status != 'closed'", (guild_id,))
-        row = cur.fetchone()
-        open_count = int(row[0]) if row else 0
-        num = open_count + 1
+    cur.row_factory = None
+    return cur
+
+
+# channel_id -> (ticket_id, status) for every ticket that is not closed. Loaded once in
+# setup_hook and kept current by the helpers that open/solve/close tickets, so
+# on_message can skip non-ticket channels without touching the DB.
+_TICKET_CHANNELS: Dict[int, Tuple[int, str]] = {}
+
+
+def load_ticket_channels():
+    with pooled_read_conn() as conn:
+        rows = tuple_cursor(conn).execute(_SQL_OPEN_TICKET_CHANNELS).fetchall()
+    _TICKET_CHANNELS.clear()
+    _TICKET_CHANNELS.update((int(cid), (tid, status)) for cid, tid, status in rows)
+
+
+def get_ticket_by_channel(channel_id: int) -> Optional[Tuple[Any, ...]]:
+    """Returns (id, opener_id, status, priority, first_message_id) or None."""
+    with pooled_read_conn() as conn:
+        return tuple_cursor(conn).execute(_SQL_TICKET_BY_CHANNEL, (channel_id,)).fetchone()
+
+
+def get_ticket_and_config(channel_id: int, guild_id: int) -> Tuple[Optional[Tuple[Any, ...]], Dict[str, Any]]:
+    """Ticket row (as get_ticket_by_channel) plus guild config, loaded in one worker-thread hop."""
+    return get_ticket_by_channel(channel_id), get_config(guild_id)
+
+
+def count_open_tickets_for_user(guild_id: int, user_id: int, limit: int) -> int:
+    """Open tickets for a user, counted up to `limit`."""
+    with pooled_read_conn() as conn:
+        row = conn.execute(_SQL_COUNT_OPEN_BY_OPENER, (guild_id, user_id, limit)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def update_ticket_priority(ticket_id: int, priority: str):
+    with pooled_conn() as conn:
+        conn.execute(_SQL_SET_TICKET_PRIORITY, (priority, ticket_id))
         conn.commit()
-        return num
-    finally:
-        conn.close()
+
+
+def mark_ticket_pending_close(
+    channel_id: int, staff_ok: bool, user_id: int
+) -> Tuple[Optional[Tuple[Any, ...]], Optional[Tuple[Any, ...]]]:
+    """Set pending_close if the caller is the opener (or staff_ok) and the ticket is not closed.
+    Returns ((id, first_message_id), None) on success, else (None, get_ticket_by_channel-style row or None).
+    """
+    with pooled_conn() as conn:
+        cur = tuple_cursor(conn)
+        t = cur.execute(_SQL_MARK_PENDING_CLOSE, (channel_id, 1 if staff_ok else 0, user_id)).fetchone()
+        conn.commit()
+        if t:
+            _TICKET_CHANNELS[channel_id] = (t[0], "pending_close")
+            return t, None
+        return None, cur.execute(_SQL_TICKET_BY_CHANNEL, (channel_id,)).fetchone()
+
+
+def list_open_ticket_channels(guild_id: int) -> List[Tuple[int, int]]:
+    """(ticket_id, channel_id) for every open ticket in a guild whose channel has been created."""
+    with pooled_read_conn() as conn:
+        return tuple_cursor(conn).execute(_SQL_OPEN_CHANNELS_BY_GUILD, (guild_id,)).fetchall()
+
+
+def mark_tickets_closed(ticket_ids: List[int]):
+    if not ticket_ids:
+        return
+    now = int(time.time())
+    with pooled_conn() as conn:
+        conn.executemany("UPDATE tickets SET status='closed', closed_at=? WHERE id=?", [(now, i) for i in ticket_ids])
+        conn.commit()
+
+
+def close_ticket(ticket_id: int, closer_id: int) -> bool:
+    """Mark a ticket closed. Returns False if it was already closed."""
+    with pooled_conn() as conn:
+        row = conn.execute(_SQL_CLOSE_TICKET, (int(time.time()), closer_id, ticket_id)).fetchone()
+        conn.commit()
+    if row is None:
+        return False
+    _TICKET_CHANNELS.pop(row[0], None)
+    return True
+
+
+def insert_pending_ticket(num: int, guild_id: int, opener_id: int, category_id: int, priority: str) -> int:
+    """Insert the ticket row before its channel exists. It stays status='pending' with a NULL
+    channel_id until finalize_ticket_records; rows left behind by a crash are removed by
+    delete_stale_pending_tickets.
+    """
+    with pooled_conn() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO tickets(ticket_number, guild_id, opener_id, channel_id, category_id, status, created_at, priority)
+            VALUES(?,?,?,NULL,?,?,?,?)
+            """,
+            (num, guild_id, opener_id, category_id, "pending", int(time.time()), priority),
+        )
+        conn.commit()
+        return cur.lastrowid
+
+
+# A pending row older than this has lost its on_submit (crash/restart) and is safe to drop
+PENDING_TICKET_MAX_AGE = 300
+
+
+def delete_stale_pending_tickets(max_age: int = PENDING_TICKET_MAX_AGE, guild_id: Optional[int] = None) -> int:
+    """Delete ticket rows that never got a channel, created more than max_age seconds ago.
+    Also catches rows written as 'open' with a NULL channel by older versions.
+    """
+    sql = "DELETE FROM tickets WHERE channel_id IS NULL AND status != 'closed' AND created_at <= ?"
+    params: List[Any] = [int(time.time()) - max_age]
+    if guild_id is not None:
+        sql += " AND guild_id = ?"
+        params.append(guild_id)
+    with pooled_conn() as conn:
+        n = conn.execute(sql, params).rowcount
+        conn.commit()
+    return n
+
+
+def discard_ticket(ticket_id: int):
+    """Drop a pending ticket row whose channel could not be created."""
+    with pooled_conn() as conn:
+        conn.execute("DELETE FROM tickets WHERE id = ? AND channel_id IS NULL", (ticket_id,))
+        conn.commit()
+
+
+def finalize_ticket_records(
+    ticket_id: int,
+    channel_id: int,
+    first_message_id: Optional[int],
+    opener_id: int,
+    submission: Dict[str, str],
+):
+    """Attach the channel/intro message to a pending ticket and log its modal submission (one commit).
+    Raises RuntimeError if the row is no longer pending (e.g. a reconcile removed it meanwhile).
+    """
+    with pooled_conn() as conn:
+        updated = conn.execute(
+            "UPDATE tickets SET channel_id = ?, first_message_id = ?, status = 'open' WHERE id = ? AND status = 'pending'",
+            (channel_id, first_message_id, ticket_id),
+        ).rowcount
+        if not updated:
+            # Nothing committed; put_conn() rolls the transaction back
+            raise RuntimeError(f"ticket {ticket_id} is no longer pending")
+        conn.execute(
+            _SQL_INSERT_MESSAGE,
+            (ticket_id, None, opener_id, json.dumps(submission, separators=_JSON_SEPARATORS, ensure_ascii=False), _EMPTY_JSON_LIST, int(time.time())),
+        )
+        conn.commit()
+    _TICKET_CHANNELS[channel_id] = (ticket_id, "open")
 
 
 class PanelSelect(discord.ui.Select):
@@ -428,36 +942,54 @@ class PanelSelect(discord.ui.Select):
             )
             return
         cat_id = int(value.split(":", 1)[1])
-        category = get_category_by_id(cat_id)
+        category = _CATEGORIES_BY_ID.get(cat_id) or await run_db(get_category_by_id, cat_id)
         if not category:
             await interaction.response.send_message(
                 "That category no longer exists.", ephemeral=True
             )
             return
-        fields = get_fields_for_category(cat_id)
+        fields = _FIELDS_CACHE.get(cat_id)
+        if fields is None:
+            fields = await run_db(get_fields_for_category, cat_id)
         modal = TicketModal(category, fields)
         # Open the modal for the user
         await interaction.response.send_modal(modal)
 
         # Workaround for Discord client select menus staying visually "stuck":
-        # Refresh the panel message's view so the select resets for everyone.
-        try:
-            if interaction.message and interaction.guild:
-                cats = list_categories(interaction.guild.id)
-                # Rebuild options from current categories (max 25)
-                options: List[discord.SelectOption] = []
-                for c in cats[:25]:
-                    options.append(
-                        discord.SelectOption(
-                            label=c["name"],
-                            description=(c["placeholder"] or "")[:100],
-                            value=f"cat:{c['id']}",
-                        )
-                    )
-                await interaction.message.edit(view=PanelView(options))
-        except Exception:
-            # Non-fatal if we cannot edit (e.g., missing perms or race)
-            pass
+        # refresh the panel message's view in the background so the select resets for everyone.
+        # A reset already in flight for this message covers this pick too, so skip the extra edit.
+        if interaction.message and interaction.guild and interaction.message.id not in _PANEL_RESETS_IN_FLIGHT:
+            _PANEL_RESETS_IN_FLIGHT.add(interaction.message.id)
+            spawn_background(reset_panel_select(interaction.message, interaction.guild.id))
+
+
+# Panel message ids with a select-reset edit in progress
+_PANEL_RESETS_IN_FLIGHT: set = set()
+
+
+async def reset_panel_select(message: discord.Message, guild_id: int):
+    try:
+        # Current categories (max 25); the view is shared until categories change
+        await message.edit(view=await get_panel_view(guild_id))
+    except Exception:
+        # Non-fatal if we cannot edit (e.g., missing perms or race)
+        pass
+    finally:
+        _PANEL_RESETS_IN_FLIGHT.discard(message.id)
+
+
+async def get_panel_view(guild_id: int) -> "PanelView":
+    """Like get_ticket_view, one PanelView instance per guild serves every panel message."""
+    view = _PANEL_VIEW_CACHE.get(guild_id)
+    if view is None:
+        gen = cache_generation("categories", guild_id)
+        options = _PANEL_OPTIONS_CACHE.get(guild_id)
+        options = list(options) if options is not None else await run_db(panel_options, guild_id)
+        view = PanelView(options)
+        with _CACHE_LOCK:
+            if cache_generation("categories", guild_id) == gen:
+                _PANEL_VIEW_CACHE[guild_id] = view
+    return view
 
 
 class PanelView(discord.ui.View):
@@ -466,47 +998,112 @@ class PanelView(discord.ui.View):
         self.add_item(PanelSelect(options))
 
 
+# Static, so built once and shared by every PrioritySelect
+_PRIORITY_OPTIONS = (
+    discord.SelectOption(label="Low", value="Low"),
+    discord.SelectOption(label="Normal", value="Normal", default=True),
+    discord.SelectOption(label="High", value="High"),
+    discord.SelectOption(label="Urgent", value="Urgent"),
+)
+
+
+# Last-known first embed per ticket: first_message_id -> (expires_at, embed, index of the Priority field)
+_FIRST_EMBED_TTL = 300
+_FIRST_EMBEDS: Dict[int, Tuple[float, discord.Embed, int]] = {}
+
+
+def remember_first_embed(first_message_id: int, embed: discord.Embed, priority_index: int):
+    now = time.time()
+    if len(_FIRST_EMBEDS) >= _SWEEP_THRESHOLD:
+        for k in [k for k, v in _FIRST_EMBEDS.items() if v[0] <= now]:
+            del _FIRST_EMBEDS[k]
+    _FIRST_EMBEDS[first_message_id] = (now + _FIRST_EMBED_TTL, embed, priority_index)
+
+
+async def refresh_priority_field(ch: discord.TextChannel, first_message_id: int, value: str):
+    """Best-effort rewrite of the Priority field on a ticket's first embed; run as a background task."""
+    mid = int(first_message_id)
+    try:
+        hit = _FIRST_EMBEDS.get(mid)
+        if hit and hit[0] > time.time():
+            # Recently sent/edited by us: patch the cached embed, skip the fetch
+            _, e, idx = hit
+            target = ch.get_partial_message(mid)
+        else:
+            msg = await ch.fetch_message(mid)
+            if not msg.embeds:
+                return
+            e = msg.embeds[0]
+            idx = next((i for i, f in enumerate(e.fields) if f.name == "Priority"), -1)
+            if idx < 0:
+                return
+            target = msg
+        e.set_field_at(idx, name="Priority", value=value, inline=True)
+        await target.edit(embed=e)
+        remember_first_embed(mid, e, idx)
+    except Exception:
+        _FIRST_EMBEDS.pop(mid, None)
+
+
+async def save_priority_and_confirm(
+    interaction: discord.Interaction,
+    ch: discord.TextChannel,
+    ticket_id: int,
+    priority: str,
+    old_name: str,
+    old_topic: Optional[str],
+):
+    """Persist a priority change while the confirmation is sent. If the write fails, put the
+    channel name/topic back, correct the confirmation (saying whether the restore worked), then re-raise.
+    """
+    saved, _ = await asyncio.gather(
+        run_db(update_ticket_priority, ticket_id, priority),
+        interaction.followup.send(f"Priority set to {priority}.", ephemeral=True),
+        return_exceptions=True,
+    )
+    if isinstance(saved, BaseException):
+        # force: the cached channel still shows the old name/topic, so the guard would skip this
+        restored = await try_edit_channel(ch, name=old_name, topic=old_topic or "", force=True)
+        if restored:
+            msg = "Saving the priority failed, so it was not changed. Please try again."
+        else:
+            msg = "Saving the priority failed, and the channel name/topic could not be restored. Please try again."
+        try:
+            await interaction.followup.send(msg, ephemeral=True)
+        except Exception:
+            pass
+        raise saved
+
+
 class PrioritySelect(discord.ui.Select):
     def __init__(self):
-        options = [
-            discord.SelectOption(label="Low", value="Low"),
-            discord.SelectOption(label="Normal", value="Normal", default=True),
-            discord.SelectOption(label="High", value="High"),
-            discord.SelectOption(label="Urgent", value="Urgent"),
-        ]
-        super().__init__(placeholder="Select priority", min_values=1, max_values=1, options=options, custom_id="priority_select")
+        super().__init__(placeholder="Select priority", min_values=1, max_values=1, options=list(_PRIORITY_OPTIONS), custom_id="priority_select")
 
     async def callback(self, interaction: discord.Interaction):
         if not interaction.guild:
             return
         pr = self.values[0]
         # Validate ticket and permissions
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM tickets WHERE channel_id = ?", (interaction.channel_id,))
-        t = cur.fetchone()
+        t, cfg = await run_db(get_ticket_and_config, interaction.channel_id, interaction.guild.id)
         if not t:
-            conn.close()
             await interaction.response.send_message("Not a ticket channel.", ephemeral=True)
             return
-        cfg = get_config(interaction.guild.id)
+        ticket_id, _opener_id, status, current_priority, first_message_id = t
         allow = is_admin(interaction.user) or is_staff(interaction.user, cfg)  # type: ignore
         if not allow:
-            conn.close()
             await interaction.response.send_message("Only staff or admins can set priority.", ephemeral=True)
             return
         # Acknowledge quickly to avoid token expiry
         try:
-            await interaction.response.defer_update()
+            await interaction.response.defer()
         except Exception:
             pass
         # No-op if priority unchanged
-        if (t["priority"] or "").casefold() == pr.casefold():
+        if (current_priority or "").casefold() == pr.casefold():
             try:
                 await interaction.edit_original_response(content=f"Priority already {pr}.")
             except Exception:
                 pass
-            conn.close()
             return
         # Perform channel edit first; only persist if successful
         ch = interaction.channel
@@ -515,57 +1112,31 @@ class PrioritySelect(discord.ui.Select):
                 await interaction.edit_original_response(content="This is not a text channel.")
             except Exception:
                 pass
-            conn.close()
             return
-        solved = (t["status"] in ("pending_close", "closed"))
-        base = ch.name
-        if base[:1] in ("⚪", "🟡", "🟠", "🔴", "🟢") and base.startswith(base[:1] + "-"):
-            base = base.split("-", 1)[1]
+        solved = (status in ("pending_close", "closed"))
+        base = strip_status_prefix(ch.name)
         if solved:
-            new_topic = "Status: 🟢 Solved (pending staff confirmation)" if t["status"] == "pending_close" else "Status: 🟢 Solved | Closed"
+            new_topic = "Status: 🟢 Solved (pending staff confirmation)" if status == "pending_close" else "Status: 🟢 Solved | Closed"
             new_name = f"🟢-{base}"
         else:
             new_topic = f"Priority: {priority_emoji(pr)} {pr}"
             new_name = f"{priority_emoji(pr)}-{base}"
+        old_name, old_topic = ch.name, ch.topic
+        # Solved tickets show 🟢 whatever the priority; try_edit_channel skips the call if nothing changes
         ok = await try_edit_channel(ch, name=new_name, topic=new_topic)
         if not ok:
             try:
                 await interaction.edit_original_response(content="Rate limited; please retry in a few minutes.")
             except Exception:
                 pass
-            conn.close()
             return
 
-        # Persist priority after successful channel update
-        cur.execute("UPDATE tickets SET priority = ? WHERE id = ?", (pr, t["id"]))
-        conn.commit()
-        conn.close()
+        # The new name/topic already announce the change; confirm to the user only
+        await save_priority_and_confirm(interaction, ch, ticket_id, pr, old_name, old_topic)
 
-        # Update first embed's Priority field if we have it (best-effort)
-        try:
-            if t["first_message_id"]:
-                msg = await ch.fetch_message(int(t["first_message_id"]))
-                if msg.embeds:
-                    e = msg.embeds[0]
-                    new = discord.Embed(title=e.title, description=e.description, color=e.color)
-                    for f in e.fields:
-                        if f.name == "Priority":
-                            val = "🟢 Solved (pending staff confirmation)" if solved and t["status"] == "pending_close" else ("🟢 Solved | Closed" if solved else f"{priority_emoji(pr)} {pr}")
-                            new.add_field(name="Priority", value=val, inline=True)
-                        else:
-                            new.add_field(name=f.name, value=f.value, inline=f.inline)
-                    await msg.edit(embed=new)
-        except Exception:
-            pass
-
-        try:
-            await ch.send(f"Priority set to {pr} by {interaction.user.mention}.")
-        except Exception:
-            pass
-        try:
-            await interaction.edit_original_response(content=f"Priority updated to {pr}.")
-        except Exception:
-            pass
+        # Update first embed's Priority field in the background once saved (solved embeds stay 🟢)
+        if first_message_id and not solved:
+            spawn_background(refresh_priority_field(ch, first_message_id, f"{priority_emoji(pr)} {pr}"))
 
 
 class PrioritySelectView(discord.ui.View):
@@ -582,35 +1153,19 @@ class TicketView(discord.ui.View):
     async def mark_solved(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.guild or not isinstance(interaction.user, discord.Member):
             return
-        # Fetch ticket by channel
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM tickets WHERE channel_id = ?",
-            (interaction.channel_id,),
-        )
-        t = cur.fetchone()
+        staff_ok = await is_admin_or_staff(interaction.user, interaction.guild.id)
+        # Update status to pending_close in one statement (opener or staff/admin only);
+        # the ticket is only re-read to explain why nothing matched
+        t, existing = await run_db(mark_ticket_pending_close, interaction.channel_id, staff_ok, interaction.user.id)
         if not t:
-            conn.close()
-            await interaction.response.send_message("Not a ticket channel.", ephemeral=True)
-            return
-        cfg = get_config(interaction.guild.id)
-        is_allowed = (int(t["opener_id"]) == interaction.user.id) or is_admin(interaction.user) or is_staff(interaction.user, cfg)
-        if not is_allowed:
-            conn.close()
-            await interaction.response.send_message("Only the ticket opener or staff/admin can mark as solved.", ephemeral=True)
-            return
-        if t["status"] == "closed":
-            conn.close()
-            await interaction.response.send_message("Ticket already closed.", ephemeral=True)
+            if not existing:
+                await interaction.response.send_message("Not a ticket channel.", ephemeral=True)
+            elif not staff_ok and int(existing[1]) != interaction.user.id:
+                await interaction.response.send_message("Only the ticket opener or staff/admin can mark as solved.", ephemeral=True)
+            else:
+                await interaction.response.send_message("Ticket already closed.", ephemeral=True)
             return
-        # Update status to pending_close
-        cur.execute(
-            "UPDATE tickets SET status = 'pending_close' WHERE id = ?",
-            (t["id"],),
-        )
-        conn.commit()
-        conn.close()
+        _, first_message_id = t
         await interaction.response.send_message(
             "Marked as solved. Waiting for staff to confirm closing.", ephemeral=True
         )
@@ -620,26 +1175,12 @@ class TicketView(discord.ui.View):
             # Turn the indicator green and update topic + first embed
             ch = interaction.channel  # type: ignore
             if isinstance(ch, discord.TextChannel):
-                base = ch.name
-                if base[:1] in ("⚪", "🟡", "🟠", "🔴", "🟢") and base.startswith(base[:1] + "-"):
-                    base = base.split("-", 1)[1]
+                base = strip_status_prefix(ch.name)
                 ok = await try_edit_channel(ch, name=f"🟢-{base}", topic="Status: 🟢 Solved (pending staff confirmation)")
                 if not ok:
                     await try_edit_channel(ch, topic="Status: 🟢 Solved (pending staff confirmation)")
-                try:
-                    if t.get("first_message_id"):
-                        msg = await ch.fetch_message(int(t["first_message_id"]))
-                        if msg.embeds:
-                            e = msg.embeds[0]
-                            new = discord.Embed(title=e.title, description=e.description, color=e.color)
-                            for f in e.fields:
-                                if f.name == "Priority":
-                                    new.add_field(name="Priority", value="🟢 Solved (pending staff confirmation)", inline=True)
-                                else:
-                                    new.add_field(name=f.name, value=f.value, inline=f.inline)
-                            await msg.edit(embed=new)
-                except Exception:
-                    pass
+                if first_message_id:
+                    await refresh_priority_field(ch, first_message_id, "🟢 Solved (pending staff confirmation)")
         except Exception:
             pass
 
@@ -647,25 +1188,20 @@ class TicketView(discord.ui.View):
     async def confirm_close(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.guild or not isinstance(interaction.user, discord.Member):
             return
-        cfg = get_config(interaction.guild.id)
+        t, cfg = await run_db(get_ticket_and_config, interaction.channel_id, interaction.guild.id)
         if not (is_admin(interaction.user) or is_staff(interaction.user, cfg)):
             await interaction.response.send_message("You are not allowed to close this ticket.", ephemeral=True)
             return
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM tickets WHERE channel_id = ?", (interaction.channel_id,))
-        t = cur.fetchone()
         if not t:
-            conn.close()
             await interaction.response.send_message("Not a ticket channel.", ephemeral=True)
             return
-        if t["status"] == "closed":
-            conn.close()
+        ticket_id, opener_id, status, _, _ = t
+        if status == "closed":
             await interaction.response.send_message("Ticket already closed.", ephemeral=True)
             return
         # Ack quickly to avoid interaction timeout during edits/deletes
         try:
-            await interaction.response.defer_update()
+            await interaction.response.defer()
         except Exception:
             pass
         # Lock channel for opener and edit name/topic first; only persist DB if this succeeds
@@ -675,14 +1211,11 @@ class TicketView(discord.ui.View):
                 await interaction.followup.send("Not a ticket text channel.", ephemeral=True)
             except Exception:
                 pass
-            conn.close()
             return
 
-        opener = ch.guild.get_member(int(t["opener_id"]))
+        opener = ch.guild.get_member(int(opener_id))
         overwrites = ch.overwrites
-        base = ch.name if isinstance(ch, discord.TextChannel) else ch.name
-        if base[:1] in ("⚪", "🟡", "🟠", "🔴", "🟢") and base.startswith(base[:1] + "-"):
-            base = base.split("-", 1)[1]
+        base = strip_status_prefix(ch.name)
         if opener and isinstance(ch, discord.TextChannel):
             overwrites[opener] = discord.PermissionOverwrite(view_channel=True, send_messages=False)
         ok = False
@@ -705,16 +1238,15 @@ class TicketView(discord.ui.View):
                 await interaction.followup.send("Rate limited; please retry in a few minutes.", ephemeral=True)
             except Exception:
                 pass
-            conn.close()
             return
 
-        # Persist closed only after successful channel edit
-        cur.execute(
-            "UPDATE tickets SET status = 'closed', closed_at = ?, admin_closer_id = ? WHERE id = ?",
-            (int(time.time()), interaction.user.id, t["id"]),
-        )
-        conn.commit()
-        conn.close()
+        # Persist closed only after successful channel edit; guarded so a double click closes once
+        if not await run_db(close_ticket, ticket_id, interaction.user.id):
+            try:
+                await interaction.followup.send("Ticket already closed.", ephemeral=True)
+            except Exception:
+                pass
+            return
 
         try:
             await interaction.followup.send("Ticket closed.", ephemeral=True)
@@ -739,16 +1271,11 @@ class TicketView(discord.ui.View):
         if not interaction.guild or not isinstance(interaction.user, discord.Member):
             return
         # Only staff/admin can change
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM tickets WHERE channel_id = ?", (interaction.channel_id,))
-        t = cur.fetchone()
-        conn.close()
+        t, cfg = await run_db(get_ticket_and_config, interaction.channel_id, interaction.guild.id)
         if not t:
             await interaction.response.send_message("Not a ticket channel.", ephemeral=True)
             return
-        cfg = get_config(interaction.guild.id)
-        staff_ok = is_staff(interaction.user, cfg) or is_admin(interaction.user)
+        staff_ok = is_admin(interaction.user) or is_staff(interaction.user, cfg)
         if not staff_ok:
             await interaction.response.send_message("Only staff or admins can change priority.", ephemeral=True)
             return
@@ -757,8 +1284,60 @@ class TicketView(discord.ui.View):
         await interaction.response.send_message("Choose a priority:", view=PrioritySelectView(), ephemeral=True)
 
 
+_TICKET_VIEW: Optional[TicketView] = None
+
+
+def get_ticket_view() -> TicketView:
+    """Shared persistent TicketView (timeout=None, fixed custom_ids), so one instance serves
+    every ticket message. Created lazily because older discord.py versions need a running loop.
+    """
+    global _TICKET_VIEW
+    if _TICKET_VIEW is None:
+        _TICKET_VIEW = TicketView()
+    return _TICKET_VIEW
+
+
+# Bot member per guild for when guild.me is not cached yet (saves a fetch_member REST call)
+_GUILD_ME_CACHE: Dict[int, discord.Member] = {}
+
+
+async def get_guild_me(guild: discord.Guild) -> discord.Member:
+    if guild.me is not None:
+        return guild.me
+    me = _GUILD_ME_CACHE.get(guild.id)
+    if me is None:
+        me = await guild.fetch_member(bot.user.id)  # type: ignore
+        _GUILD_ME_CACHE[guild.id] = me
+    return me
+
+
+# Overwrites are only read by create_text_channel, so one instance can be shared
+_HIDDEN_OVERWRITE = discord.PermissionOverwrite(view_channel=False)
+_TICKET_MEMBER_OVERWRITE = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+
+
+async def ticket_overwrites(
+    guild: discord.Guild, staff_role_id: Optional[int], opener: Any
+) -> Dict[Any, discord.PermissionOverwrite]:
+    """Channel overwrites for a new ticket. Roles/members are resolved from the guild cache on
+    every call (cheap dict lookups), so a deleted or recreated staff role is never reused.
+    """
+    overwrites: Dict[Any, discord.PermissionOverwrite] = {guild.default_role: _HIDDEN_OVERWRITE}
+    staff_role = guild.get_role(int(staff_role_id)) if staff_role_id else None
+    if staff_role:
+        overwrites[staff_role] = _TICKET_MEMBER_OVERWRITE
+    # Ensure the bot can see and send in the channel
+    overwrites[await get_guild_me(guild)] = _TICKET_MEMBER_OVERWRITE
+    overwrites[opener] = _TICKET_MEMBER_OVERWRITE
+    return overwrites
+
+
+_DEFAULT_ISSUE_LABEL = "What's the issue?"
+_DEFAULT_ISSUE_FOLDED = _DEFAULT_ISSUE_LABEL.casefold()
+
+
 class TicketModal(discord.ui.Modal, title="Support Ticket"):
-    def __init__(self, category_row: sqlite3.Row, fields_rows: List[sqlite3.Row]):
+    def __init__(self, category_row: Dict[str, Any], fields_rows: List[Dict[str, Any]]):
         self.category_row = category_row
         self.fields_rows = fields_rows
         # Build inputs
@@ -766,7 +1345,7 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
         # Keep a map of input custom_id -> label to avoid using deprecated attribute access
         self._labels: Dict[str, str] = {}
         # Always include a larger multi-line field for the main issue
-        default_issue_label = "What's the issue?"
+        default_issue_label = _DEFAULT_ISSUE_LABEL
         components.append(
             discord.ui.TextInput(
                 label=default_issue_label,
@@ -776,31 +1355,26 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
             )
         )
         self._labels["builtin:issue"] = default_issue_label
-        # Add up to 4 additional admin-defined fields (Discord limit is 5 total)
-        filtered = []
+        # Add up to 4 additional admin-defined fields (Discord limit is 5 total), in one pass
         for f in fields_rows:
-            try:
-                if (f["label"] or "").strip().casefold() == default_issue_label.casefold():
-                    continue
-            except Exception:
-                pass
-            filtered.append(f)
-        for f in filtered[:4]:
+            label = f["label"]
+            if (label or "").strip().casefold() == _DEFAULT_ISSUE_FOLDED:
+                continue
             style = discord.TextStyle.short if (f["style"] or "short") == "short" else discord.TextStyle.paragraph
             key = f"field:{f['id']}"
-            ti = discord.ui.TextInput(
-                label=f["label"],
-                custom_id=key,
-                required=bool(f["required"]),
-                style=style,
-                min_length=f["min_length"] if f["min_length"] else None,
-                max_length=f["max_length"] if f["max_length"] else None,
+            components.append(
+                discord.ui.TextInput(
+                    label=label,
+                    custom_id=key,
+                    required=bool(f["required"]),
+                    style=style,
+                    min_length=f["min_length"] or None,
+                    max_length=f["max_length"] or None,
+                )
             )
-            components.append(ti)
-            try:
-                self._labels[key] = f["label"]
-            except Exception:
-                pass
+            self._labels[key] = label
+            if len(components) == 5:
+                break
 
         super().__init__(timeout=None)
         for c in components:
@@ -821,7 +1395,7 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
             return
 
         guild = interaction.guild
-        cfg = get_config(guild.id)
+        cfg = await get_config_async(guild.id)
 
         # Simple anti-spam: per-user short gate
         try:
@@ -832,6 +1406,7 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
                 if exp and now < exp:
                     await interaction.followup.send("You're doing that too fast. Please wait a few seconds and try again.", ephemeral=True)
                     return
+                _sweep_expired(_OPEN_GATES, now)
                 _OPEN_GATES[gk] = now + OPEN_TICKET_GATE_SECONDS
         except Exception:
             pass
@@ -839,18 +1414,12 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
         # Limit max open tickets per user (default 1)
         try:
             if OPEN_TICKETS_PER_USER_LIMIT > 0:
-                conn = get_conn()
-                cur = conn.cursor()
-                cur.execute(
-                    "SELECT COUNT(1) FROM tickets WHERE guild_id = ? AND opener_id = ? AND status != 'closed'",
-                    (guild.id, interaction.user.id),
+                count_open = await run_db(
+                    count_open_tickets_for_user, guild.id, interaction.user.id, OPEN_TICKETS_PER_USER_LIMIT
                 )
-                row = cur.fetchone()
-                conn.close()
-                count_open = int(row[0]) if row else 0
                 if count_open >= OPEN_TICKETS_PER_USER_LIMIT:
                     await interaction.followup.send(
-                        f"You already have {count_open} open ticket(s). Please close an existing ticket before opening another.",
+                        f"You already have the maximum of {OPEN_TICKETS_PER_USER_LIMIT} open ticket(s). Please close an existing ticket before opening another.",
                         ephemeral=True,
                     )
                     return
@@ -875,25 +1444,16 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
         except Exception:
             pass
 
-        # Queue number based on current open tickets (+1), under a short lock
-        num = reserve_open_ticket_number(guild.id)
+        # Queue number based on current open tickets (+1); a lock-free display number, so two
+        # simultaneous opens may share it (the channel name is not a unique key)
+        num = await run_db(reserve_open_ticket_number, guild.id)
         # Default priority is Low; can be changed after channel opens via button or admin command
         priority = "Low"
 
         # Create channel name base and include priority emoji as prefix if possible
         base_name = f"{slugify_username(interaction.user.display_name)}-{num}"
         name_with_emoji = f"{priority_emoji(priority)}-{base_name}"
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True),
-        }
-        staff_role_id = cfg.get("staff_role_id")
-        staff_role = guild.get_role(int(staff_role_id)) if staff_role_id else None
-        if staff_role:
-            overwrites[staff_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
-        # Ensure the bot can see and send in the channel
-        me = guild.me or await guild.fetch_member(bot.user.id)  # type: ignore
-        overwrites[me] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+        overwrites = await ticket_overwrites(guild, cfg.get("staff_role_id"), interaction.user)
 
         parent = None
         if cfg.get("ticket_category_id"):
@@ -911,6 +1471,10 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
                 except Exception:
                     pass
 
+        # Insert the ticket row while Discord creates the channel; channel_id is attached afterwards
+        insert_task = asyncio.create_task(
+            run_db(insert_pending_ticket, num, guild.id, interaction.user.id, self.category_row["id"], priority)
+        )
         try:
             try:
                 channel = await safe_create_text_channel(
@@ -932,6 +1496,10 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
                     reason=f"New support ticket by {interaction.user}",
                 )
         except discord.errors.RateLimited:
+            try:
+                await run_db(discard_ticket, await insert_task)
+            except Exception:
+                pass  # the stale-pending sweep catches the row later
             # Keep it simple: no background queue, no ETA; user can retry
             try:
                 await interaction.followup.send(
@@ -941,90 +1509,86 @@ class TicketModal(discord.ui.Modal, title="Support Ticket"):
             except Exception:
                 pass
             return
-
-        # Persist ticket row
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO tickets(ticket_number, guild_id, opener_id, channel_id, category_id, status, created_at, priority)
-            VALUES(?,?,?,?,?,?,?,?)
-            """,
-            (
-                num,
-                guild.id,
-                interaction.user.id,
-                channel.id,
-                self.category_row["id"],
-                "open",
-                int(time.time()),
-                priority,
-            ),
-        )
-        ticket_id = cur.lastrowid
-        conn.commit()
-
-        # Compose initial embed with fields
-        embed = discord.Embed(
-            title=f"Ticket {slugify_username(interaction.user.display_name)}-{num} — {self.category_row['name']}",
-            color=discord.Color.blurple(),
-        )
-        embed.add_field(name="Opener", value=interaction.user.mention, inline=False)
-        embed.add_field(name="Priority", value=f"{priority_emoji(priority)} {priority}", inline=True)
-        for item in self.children:
-            if isinstance(item, discord.ui.TextInput):
-                # store as content JSON entry as well
-                label = self._labels.get(item.custom_id, str(item.custom_id))  # type: ignore
-                embed.add_field(name=label, value=item.value or "(blank)", inline=False)
-
-        # Intro text (mention opener so they get a ping in the channel)
-        # Tailor instructions based on what the opener is allowed to do
-        user_is_staff_or_admin = is_admin(interaction.user) or is_staff(interaction.user, cfg)  # type: ignore
-        can_change_priority = user_is_staff_or_admin
-        can_mark_solved = True  # the opener can always mark as solved
-
-        lines = [
-            f"{interaction.user.mention} Thanks for reaching out! A staff member will respond as soon as possible."
-        ]
-        if can_change_priority:
-            lines.append("Use 'Set Priority' to change urgency.")
-        if can_mark_solved:
-            lines.append("Use 'Mark as Solved' if the issue is resolved.")
-        intro = "\n".join(lines)
-
-        view = TicketView()
-        first_msg_id: Optional[int] = None
+        except Exception:
+            try:
+                await run_db(discard_ticket, await insert_task)
+            except Exception:
+                pass  # keep the channel-creation error; the stale-pending sweep catches the row later
+            raise
+        ticket_id: Optional[int] = None
         try:
-            msg = await channel.send(
-                content=intro,
-                embed=embed,
-                view=view,
-                allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False),
+            ticket_id = await insert_task
+
+            # Compose initial embed with fields
+            embed = discord.Embed(
+                title=f"Ticket {base_name} — {self.category_row['name']}",
+                color=discord.Color.blurple(),
             )
-            first_msg_id = msg.id
+            embed.add_field(name="Opener", value=interaction.user.mention, inline=False)
+            embed.add_field(name="Priority", value=f"{priority_emoji(priority)} {priority}", inline=True)
+            for item in self.children:
+                if isinstance(item, discord.ui.TextInput):
+                    # store as content JSON entry as well
+                    label = self._labels.get(item.custom_id, str(item.custom_id))  # type: ignore
+                    embed.add_field(name=label, value=item.value or "(blank)", inline=False)
+
+            # Intro text (mention opener so they get a ping in the channel)
+            # Tailor instructions based on what the opener is allowed to do
+            user_is_staff_or_admin = is_admin(interaction.user) or is_staff(interaction.user, cfg)  # type: ignore
+            can_change_priority = user_is_staff_or_admin
+            can_mark_solved = True  # the opener can always mark as solved
+
+            lines = [
+                f"{interaction.user.mention} Thanks for reaching out! A staff member will respond as soon as possible."
+            ]
+            if can_change_priority:
+                lines.append("Use 'Set Priority' to change urgency.")
+            if can_mark_solved:
+                lines.append("Use 'Mark as Solved' if the issue is resolved.")
+            intro = "\n".join(lines)
+
+            view = get_ticket_view()
+            first_msg_id: Optional[int] = None
+            try:
+                msg = await channel.send(
+                    content=intro,
+                    embed=embed,
+                    view=view,
+                    allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False),
+                )
+                first_msg_id = msg.id
+                # The Priority field is always added second (index 1)
+                remember_first_embed(msg.id, embed, 1)
+            except Exception:
+                first_msg_id = None
+
+            # Log modal submission as first message in DB
+            content_dict = {}
+            for item in self.children:
+                if isinstance(item, discord.ui.TextInput):
+                    label = self._labels.get(item.custom_id, str(item.custom_id))  # type: ignore
+                    content_dict[label] = item.value
+            await run_db(finalize_ticket_records, ticket_id, channel.id, first_msg_id, interaction.user.id, content_dict)
         except Exception:
-            first_msg_id = None
-
-        # Log modal submission as first message in DB
-        content_dict = {}
-        for item in self.children:
-            if isinstance(item, discord.ui.TextInput):
-                label = self._labels.get(item.custom_id, str(item.custom_id))  # type: ignore
-                content_dict[label] = item.value
-        cur.execute(
-            "INSERT INTO messages(ticket_id, discord_message_id, author_id, content, attachments_json, created_at) VALUES (?,?,?,?,?,?)",
-            (ticket_id, None, interaction.user.id, json.dumps(content_dict), json.dumps([]), int(time.time())),
-        )
-        if first_msg_id is not None:
-            cur.execute("UPDATE tickets SET first_message_id = ? WHERE id = ?", (first_msg_id, ticket_id))
-        conn.commit()
-        conn.close()
+            # Anything failing before finalize would leave a pending row and a channel nobody can use
+            if ticket_id is not None:
+                try:
+                    await run_db(discard_ticket, ticket_id)
+                except Exception:
+                    pass
+            try:
+                await channel.delete(reason="Ticket setup failed")
+            except Exception:
+                pass
+            raise
 
         # Start per-category cooldown for this user
         try:
             if TICKET_OPEN_COOLDOWN_SECONDS > 0:
                 ck = _cd_key(guild.id, int(self.category_row["id"]), interaction.user.id)
-                _USER_CATEGORY_COOLDOWNS[ck] = time.time() + TICKET_OPEN_COOLDOWN_SECONDS
+                now = time.time()
+                _sweep_expired(_USER_CATEGORY_COOLDOWNS, now)
+                _USER_CATEGORY_COOLDOWNS[ck] = now + TICKET_OPEN_COOLDOWN_SECONDS
         except Exception:
             pass
 
@@ -1071,44 +1635,59 @@ def require_admin():
 @admin_group.command(name="set_support_channel", description="Set the channel where the panel will be posted")
 @require_admin()
 async def set_support_channel(interaction: discord.Interaction, channel: discord.TextChannel):
-    upsert_config(interaction.guild_id, support_channel_id=channel.id)
+    await run_db(upsert_config, interaction.guild_id, support_channel_id=channel.id)
     await interaction.response.send_message(f"Support channel set to {channel.mention}", ephemeral=True)
 
 
 @admin_group.command(name="set_ticket_category", description="Set the category for new ticket channels")
 @require_admin()
 async def set_ticket_category(interaction: discord.Interaction, category: discord.CategoryChannel):
-    upsert_config(interaction.guild_id, ticket_category_id=category.id)
+    await run_db(upsert_config, interaction.guild_id, ticket_category_id=category.id)
     await interaction.response.send_message(f"Ticket parent category set to {category.name}", ephemeral=True)
 
 
+# Channel REST calls in flight at once for bulk admin operations (staff role changes, reconcile)
+CHANNEL_FANOUT_CONCURRENCY = 5
+
+
+async def update_staff_overwrites(guild: discord.Guild, role: discord.Role, grant: bool) -> int:
+    """Grant or revoke `role` on every open ticket channel, a few edits at a time. Returns channels updated."""
+    rows = await run_db(list_open_ticket_channels, guild.id)
+    sem = asyncio.Semaphore(CHANNEL_FANOUT_CONCURRENCY)
+
+    async def apply(cid: int) -> int:
+        ch = guild.get_channel(cid)
+        if not isinstance(ch, discord.TextChannel):
+            return 0
+        overwrites = ch.overwrites
+        if grant:
+            overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+            reason = "Set staff role; grant access"
+        elif role in overwrites:
+            del overwrites[role]
+            reason = "Unset staff role; revoke access"
+        else:
+            return 0
+        async with sem:
+            return 1 if await try_edit_channel(ch, overwrites=overwrites, reason=reason) else 0
+
+    return sum(await asyncio.gather(*(apply(channel_id) for _, channel_id in rows)))
+
+
 @admin_group.command(name="set_staff_role", description="Set the staff role; grants access to all open tickets")
 @require_admin()
 async def set_staff_role(interaction: discord.Interaction, role: discord.Role):
-    upsert_config(interaction.guild_id, staff_role_id=role.id)
+    await run_db(upsert_config, interaction.guild_id, staff_role_id=role.id)
+    await interaction.response.defer(ephemeral=True)
     # Grant access on all open ticket channels
-    updated = 0
-    if interaction.guild:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT channel_id FROM tickets WHERE guild_id = ? AND status != 'closed'", (interaction.guild.id,))
-        chans = [int(r[0]) for r in cur.fetchall()]
-        conn.close()
-        for cid in chans:
-            ch = interaction.guild.get_channel(cid)
-            if isinstance(ch, discord.TextChannel):
-                overwrites = ch.overwrites
-                overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
-                ok = await try_edit_channel(ch, overwrites=overwrites, reason="Set staff role; grant access")
-                if ok:
-                    updated += 1
-    await interaction.response.send_message(f"Staff role set to {role.mention}. Updated {updated} open tickets.", ephemeral=True)
+    updated = await update_staff_overwrites(interaction.guild, role, grant=True) if interaction.guild else 0
+    await interaction.followup.send(f"Staff role set to {role.mention}. Updated {updated} open tickets.", ephemeral=True)
 
 
 @admin_group.command(name="remove_staff_role", description="Unset the staff role and revoke it from open tickets")
 @require_admin()
 async def remove_staff_role(interaction: discord.Interaction, role: discord.Role):
-    cfg = get_config(interaction.guild_id)
+    cfg = await get_config_async(interaction.guild_id)
     old_role_id = cfg.get("staff_role_id")
     if not old_role_id:
         await interaction.response.send_message("No staff role is configured.", ephemeral=True)
@@ -1116,58 +1695,32 @@ async def remove_staff_role(interaction: discord.Interaction, role: discord.Role
     if int(old_role_id) != role.id:
         await interaction.response.send_message(f"{role.mention} is not the configured staff role.", ephemeral=True)
         return
-    upsert_config(interaction.guild_id, staff_role_id=None)
-    updated = 0
-    if interaction.guild:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT channel_id FROM tickets WHERE guild_id = ? AND status != 'closed'", (interaction.guild.id,))
-        chans = [int(r[0]) for r in cur.fetchall()]
-        conn.close()
-        for cid in chans:
-            ch = interaction.guild.get_channel(cid)
-            if isinstance(ch, discord.TextChannel):
-                overwrites = ch.overwrites
-                if role in overwrites:
-                    del overwrites[role]
-                    ok = await try_edit_channel(ch, overwrites=overwrites, reason="Unset staff role; revoke access")
-                    if ok:
-                        updated += 1
-    await interaction.response.send_message(f"Staff role {role.mention} unset. Updated {updated} open tickets.", ephemeral=True)
+    await run_db(upsert_config, interaction.guild_id, staff_role_id=None)
+    await interaction.response.defer(ephemeral=True)
+    updated = await update_staff_overwrites(interaction.guild, role, grant=False) if interaction.guild else 0
+    await interaction.followup.send(f"Staff role {role.mention} unset. Updated {updated} open tickets.", ephemeral=True)
 
 
 @admin_group.command(name="set_panel", description="Set panel title/description/contact name")
 @require_admin()
 async def set_panel(interaction: discord.Interaction, title: str, description: str, contact_name: str):
-    upsert_config(interaction.guild_id, panel_title=title, panel_description=description, contact_name=contact_name)
+    await run_db(
+        upsert_config, interaction.guild_id, panel_title=title, panel_description=description, contact_name=contact_name
+    )
     await interaction.response.send_message("Panel content updated.", ephemeral=True)
 
 
 @admin_group.command(name="add_category", description="Add a ticket category")
 @require_admin()
 async def add_category(interaction: discord.Interaction, name: str, placeholder: Optional[str] = None):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO categories(guild_id, name, placeholder, active) VALUES (?,?,?,1)",
-        (interaction.guild_id, name, placeholder),
-    )
-    conn.commit()
-    conn.close()
+    await run_db(insert_category, interaction.guild_id, name, placeholder)
     await interaction.response.send_message(f"Category '{name}' added.", ephemeral=True)
 
 
 @admin_group.command(name="remove_category", description="Remove a ticket category")
 @require_admin()
 async def remove_category(interaction: discord.Interaction, name: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "DELETE FROM categories WHERE guild_id = ? AND name = ?",
-        (interaction.guild_id, name),
-    )
-    conn.commit()
-    conn.close()
+    await run_db(delete_category, interaction.guild_id, name)
     await interaction.response.send_message(f"Category '{name}' removed (if it existed).", ephemeral=True)
 
 
@@ -1182,62 +1735,49 @@ async def add_field(
     required: bool = True,
     style: str = "short",
 ):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id FROM categories WHERE guild_id = ? AND name = ?",
-        (interaction.guild_id, category_name),
-    )
-    row = cur.fetchone()
-    if not row:
-        conn.close()
+    cat_id = await run_db(find_category_id, interaction.guild_id, category_name)
+    if cat_id is None:
         await interaction.response.send_message("Category not found.", ephemeral=True)
         return
-    cat_id = int(row[0])
     style_val = "paragraph" if style.lower().startswith("p") else "short"
-    cur.execute(
-        "INSERT INTO fields(category_id, name, label, required, style) VALUES (?,?,?,?,?)",
-        (cat_id, field_name, label, 1 if required else 0, style_val),
-    )
-    conn.commit()
-    conn.close()
+    await run_db(insert_fields, cat_id, [(field_name, label, 1 if required else 0, style_val)])
     await interaction.response.send_message(
         f"Field '{label}' added to category '{category_name}'.", ephemeral=True
     )
 
 
-@admin_group.command(name="remove_field", description="Remove a modal field from a category")
+@admin_group.command(name="remove_field", description="Remove modal fields from a category")
 @require_admin()
-async def remove_field(interaction: discord.Interaction, category_name: str, field_name: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id FROM categories WHERE guild_id = ? AND name = ?",
-        (interaction.guild_id, category_name),
-    )
-    row = cur.fetchone()
-    if not row:
-        conn.close()
+@app_commands.describe(
+    field_name="Field name (matched exactly)",
+    more_fields="Optional: further field names to remove, separated by commas",
+)
+async def remove_field(
+    interaction: discord.Interaction,
+    category_name: str,
+    field_name: str,
+    more_fields: Optional[str] = None,
+):
+    # field_name is taken verbatim so existing names containing commas stay removable
+    extra = (n.strip() for n in (more_fields or "").split(","))
+    names = list(dict.fromkeys([field_name, *(n for n in extra if n)]))
+    cat_id = await run_db(find_category_id, interaction.guild_id, category_name)
+    if cat_id is None:
         await interaction.response.send_message("Category not found.", ephemeral=True)
         return
-    cat_id = int(row[0])
-    cur.execute(
-        "DELETE FROM fields WHERE category_id = ? AND name = ?",
-        (cat_id, field_name),
-    )
-    conn.commit()
-    conn.close()
-    await interaction.response.send_message(
-        f"Field '{field_name}' removed from category '{category_name}' (if it existed).",
-        ephemeral=True,
-    )
+    await run_db(delete_fields, cat_id, names)
+    if len(names) == 1:
+        msg = f"Field '{field_name}' removed from category '{category_name}' (if it existed)."
+    else:
+        msg = f"Fields {', '.join(repr(n) for n in names)} removed from category '{category_name}' (if they existed)."
+    await interaction.response.send_message(msg, ephemeral=True)
 
 
 @admin_group.command(name="list_config", description="Show current config and categories")
 @require_admin()
 async def list_config(interaction: discord.Interaction):
-    cfg = get_config(interaction.guild_id)
-    cats = list_categories(interaction.guild_id)
+    cfg = await get_config_async(interaction.guild_id)
+    cats = await run_db(list_categories, interaction.guild_id)
     lines = []
     support_ch = f"<#{cfg['support_channel_id']}>" if cfg.get('support_channel_id') else 'not set'
     staff_role = f"<@&{cfg['staff_role_id']}>" if cfg.get('staff_role_id') else 'not set'
@@ -1251,8 +1791,9 @@ async def list_config(interaction: discord.Interaction):
     if not cats:
         lines.append("- (none)")
     else:
+        fields_by_cat = await run_db(get_fields_for_categories, [int(c["id"]) for c in cats])
         for c in cats:
-            fields = get_fields_for_category(int(c["id"]))
+            fields = fields_by_cat[int(c["id"])]
             lines.append(f"- {c['name']} ({len(fields)} fields)")
             for f in fields:
                 # Show label plus the field 'name' (used by remove_field) and DB id for clarity
@@ -1264,10 +1805,20 @@ async def list_config(interaction: discord.Interaction):
     await interaction.response.send_message(text, ephemeral=True)
 
 
+# Channel permissions the bot needs to post the panel, checked with a single mask test
+_PANEL_PERMS = (
+    ("view_channel", "View Channel"),
+    ("send_messages", "Send Messages"),
+    ("read_message_history", "Read Message History"),
+    ("embed_links", "Embed Links"),
+)
+_PANEL_PERMS_MASK = discord.Permissions(**{flag: True for flag, _ in _PANEL_PERMS}).value
+
+
 @admin_group.command(name="post_panel", description="Post the support panel in the configured channel")
 @require_admin()
 async def post_panel(interaction: discord.Interaction):
-    cfg = get_config(interaction.guild_id)
+    cfg = await get_config_async(interaction.guild_id)
     channel_id = cfg.get("support_channel_id")
     if not channel_id:
         await interaction.response.send_message("Support channel not set.", ephemeral=True)
@@ -1277,24 +1828,16 @@ async def post_panel(interaction: discord.Interaction):
         await interaction.response.send_message("Configured support channel is invalid.", ephemeral=True)
         return
     # Permission pre-check to avoid failure
-    me = interaction.guild.me or await interaction.guild.fetch_member(bot.user.id)  # type: ignore
+    me = await get_guild_me(interaction.guild)  # type: ignore
     perms = ch.permissions_for(me)
-    missing = []
-    if not perms.view_channel:
-        missing.append("View Channel")
-    if not perms.send_messages:
-        missing.append("Send Messages")
-    if not perms.read_message_history:
-        missing.append("Read Message History")
-    if not perms.embed_links:
-        missing.append("Embed Links")
-    if missing:
+    if _PANEL_PERMS_MASK & ~perms.value:
+        missing = [label for flag, label in _PANEL_PERMS if not getattr(perms, flag)]
         await interaction.response.send_message(
             f"Missing channel permissions in {ch.mention}: {', '.join(missing)}",
             ephemeral=True,
         )
         return
-    cats = list_categories(interaction.guild_id)
+    cats = await run_db(list_categories, interaction.guild_id)
     if not cats:
         await interaction.response.send_message("Please add at least one category first.", ephemeral=True)
         return
@@ -1306,18 +1849,7 @@ async def post_panel(interaction: discord.Interaction):
     )
     embed = discord.Embed(title=title, description=description, color=discord.Color.green())
 
-    # Select options
-    options = []
-    for c in cats[:25]:  # max 25 options
-        options.append(
-            discord.SelectOption(
-                label=c["name"],
-                description=(c["placeholder"] or "")[:100],
-                value=f"cat:{c['id']}",
-            )
-        )
-
-    view = PanelView(options)
+    view = await get_panel_view(interaction.guild_id)  # type: ignore
     try:
         await ch.send(embed=embed, view=view)
         await interaction.response.send_message("Panel posted.", ephemeral=True)
@@ -1345,60 +1877,39 @@ async def set_ticket_priority(interaction: discord.Interaction, priority: app_co
     if not interaction.channel or not interaction.guild:
         await interaction.response.send_message("Use this in a ticket channel.", ephemeral=True)
         return
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, ticket_number, status, first_message_id FROM tickets WHERE channel_id = ?", (interaction.channel.id,))
-    t = cur.fetchone()
+    # The channel edit can wait out a short rate limit; acknowledge first so the token stays valid
+    await interaction.response.defer(ephemeral=True)
+    t = await run_db(get_ticket_by_channel, interaction.channel.id)
     if not t:
-        conn.close()
-        await interaction.response.send_message("This is not a ticket channel.", ephemeral=True)
+        await interaction.followup.send("This is not a ticket channel.", ephemeral=True)
         return
+    ticket_id, _opener_id, status, current_priority, first_message_id = t
     # No-op if unchanged
-    if (t["priority"] or "").casefold() == priority.value.casefold():
-        await interaction.response.send_message(f"Priority already {priority.value}.", ephemeral=True)
-        conn.close()
+    if (current_priority or "").casefold() == priority.value.casefold():
+        await interaction.followup.send(f"Priority already {priority.value}.", ephemeral=True)
         return
     # Perform channel edit first; only persist if successful
     ch = interaction.channel
     if not isinstance(ch, discord.TextChannel):
-        await interaction.response.send_message("This is not a text channel.", ephemeral=True)
-        conn.close()
+        await interaction.followup.send("This is not a text channel.", ephemeral=True)
         return
-    solved = (t["status"] in ("pending_close", "closed"))
-    base = ch.name
-    if base[:1] in ("⚪", "🟡", "🟠", "🔴", "🟢") and base.startswith(base[:1] + "-"):
-        base = base.split("-", 1)[1]
+    solved = (status in ("pending_close", "closed"))
+    base = strip_status_prefix(ch.name)
     if solved:
-        new_topic = "Status: 🟢 Solved (pending staff confirmation)" if t["status"] == "pending_close" else "Status: 🟢 Solved | Closed"
+        new_topic = "Status: 🟢 Solved (pending staff confirmation)" if status == "pending_close" else "Status: 🟢 Solved | Closed"
         new_name = f"🟢-{base}"
     else:
         new_topic = f"Priority: {priority_emoji(priority.value)} {priority.value}"
         new_name = f"{priority_emoji(priority.value)}-{base}"
+    old_name, old_topic = ch.name, ch.topic
     ok = await try_edit_channel(ch, name=new_name, topic=new_topic)
     if not ok:
-        await interaction.response.send_message("Rate limited; please retry in a few minutes.", ephemeral=True)
-        conn.close()
+        await interaction.followup.send("Rate limited; please retry in a few minutes.", ephemeral=True)
         return
-    cur.execute("UPDATE tickets SET priority = ? WHERE id = ?", (priority.value, t["id"]))
-    conn.commit()
-    conn.close()
-    # Update first embed's Priority field if available (best-effort)
-    try:
-        if t and t["first_message_id"] and isinstance(ch, discord.TextChannel):
-            msg = await ch.fetch_message(int(t["first_message_id"]))
-            if msg.embeds:
-                e = msg.embeds[0]
-                new = discord.Embed(title=e.title, description=e.description, color=e.color)
-                for f in e.fields:
-                    if f.name == "Priority":
-                        val = "🟢 Solved (pending staff confirmation)" if solved and t["status"] == "pending_close" else ("🟢 Solved | Closed" if solved else f"{priority_emoji(priority.value)} {priority.value}")
-                        new.add_field(name="Priority", value=val, inline=True)
-                    else:
-                        new.add_field(name=f.name, value=f.value, inline=f.inline)
-                await msg.edit(embed=new)
-    except Exception:
-        pass
-    await interaction.response.send_message(f"Priority set to {priority.value}.", ephemeral=True)
+    await save_priority_and_confirm(interaction, ch, ticket_id, priority.value, old_name, old_topic)
+    # Update first embed's Priority field in the background once saved (solved embeds stay 🟢)
+    if first_message_id and not solved:
+        spawn_background(refresh_priority_field(ch, first_message_id, f"{priority_emoji(priority.value)} {priority.value}"))
 
 
 # Removed access role commands to keep only staff role add/remove as requested
@@ -1412,57 +1923,102 @@ async def reconcile_tickets(interaction: discord.Interaction, close_all: bool =
         return
     await interaction.response.defer(ephemeral=True)
     guild = interaction.guild
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, channel_id, status, opener_id FROM tickets WHERE guild_id = ? AND status != 'closed'", (guild.id,))
-    rows = cur.fetchall()
-    closed_missing = 0
-    closed_all = 0
-    for r in rows:
-        ch = guild.get_channel(int(r["channel_id"]))
-        if ch is None or not isinstance(ch, discord.TextChannel):
-            cur.execute("UPDATE tickets SET status='closed', closed_at=? WHERE id=?", (int(time.time()), r["id"]))
-            closed_missing += 1
+    # Rows whose creation never finished (crash between insert and finalize)
+    removed_pending = await run_db(delete_stale_pending_tickets, PENDING_TICKET_MAX_AGE, guild.id)
+    rows = await run_db(list_open_ticket_channels, guild.id)
+    missing: List[int] = []
+    to_close: List[discord.TextChannel] = []
+    close_ids: List[int] = []
+    for ticket_id, channel_id in rows:
+        ch = guild.get_channel(channel_id)
+        if not isinstance(ch, discord.TextChannel):
+            missing.append(ticket_id)
         elif close_all:
+            to_close.append(ch)
+            close_ids.append(ticket_id)
+        else:
+            continue
+        _TICKET_CHANNELS.pop(channel_id, None)
+    # One executemany for every ticket closed by this run
+    await run_db(mark_tickets_closed, missing + close_ids)
+
+    sem = asyncio.Semaphore(CHANNEL_FANOUT_CONCURRENCY)
+
+    async def close_channel(ch: discord.TextChannel):
+        async with sem:
             try:
                 await ch.send("Closing by admin reconcile.")
             except Exception:
                 pass
-            cur.execute("UPDATE tickets SET status='closed', closed_at=? WHERE id=?", (int(time.time()), r["id"]))
-            closed_all += 1
             if delete_channels:
                 try:
                     await ch.delete(reason="Closed by admin reconcile")
                 except Exception:
                     pass
-    conn.commit()
-    conn.close()
+
+    await asyncio.gather(*(close_channel(ch) for ch in to_close))
+    closed_missing = len(missing)
+    closed_all = len(to_close)
     await interaction.followup.send(
-        f"Reconcile done. Closed missing: {closed_missing}.{' Closed open: ' + str(closed_all) if close_all else ''}",
+        f"Reconcile done. Closed missing: {closed_missing}.{' Closed open: ' + str(closed_all) if close_all else ''}"
+        f"{' Removed unfinished: ' + str(removed_pending) if removed_pending else ''}",
         ephemeral=True,
     )
 
 
+def get_meta(key: str) -> Optional[str]:
+    with pooled_read_conn() as conn:
+        row = conn.execute("SELECT value FROM bot_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(key: str, value: str):
+    with pooled_conn() as conn:
+        conn.execute(
+            "INSERT INTO bot_meta(key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+        conn.commit()
+
+
+def command_tree_hash() -> str:
+    """Stable hash of the registered app commands, used to skip redundant tree syncs."""
+    payload = []
+    for cmd in bot.tree.get_commands():
+        try:
+            payload.append(cmd.to_dict(bot.tree))  # type: ignore[call-arg]  # discord.py >= 2.4
+        except TypeError:
+            payload.append(cmd.to_dict())  # type: ignore[call-arg]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# on_ready fires again after every gateway reconnect; the command sync only needs to run once
+_SYNCED = False
+
+
 @bot.event
 async def on_ready():
-    # Register persistent views for button handling across restarts
-    try:
-        bot.add_view(TicketView())
-        # Also register a PanelView stub so selects on old panels still work
-        # We add a minimal option to satisfy the component structure; options on the message will be used
-        stub_option = discord.SelectOption(label="Select", value="cat:0")
-        bot.add_view(PanelView([stub_option]))
-    except Exception:
-        pass
+    global _SYNCED
+    if _SYNCED:
+        print(f"Reconnected as {bot.user} (ID: {bot.user.id})")
+        return
 
-    # Sync commands
+    # Sync commands (skipped when the command tree is unchanged since the last sync).
+    # _SYNCED is only set once that is settled, so a failed sync is retried on the next on_ready.
     try:
-        if GUILD_ID_ENV:
-            guild_obj = discord.Object(id=int(GUILD_ID_ENV))
-            bot.tree.copy_global_to(guild=guild_obj)
-            await bot.tree.sync(guild=guild_obj)
+        sync_key = f"command_tree:{GUILD_ID_ENV or 'global'}"
+        tree_hash = command_tree_hash()
+        if FORCE_COMMAND_SYNC or await run_db(get_meta, sync_key) != tree_hash:
+            if GUILD_ID_ENV:
+                guild_obj = discord.Object(id=int(GUILD_ID_ENV))
+                bot.tree.copy_global_to(guild=guild_obj)
+                await bot.tree.sync(guild=guild_obj)
+            else:
+                await bot.tree.sync()
+            _SYNCED = True
+            await run_db(set_meta, sync_key, tree_hash)
         else:
-            await bot.tree.sync()
+            _SYNCED = True
     except Exception as e:
         print(f"Failed to sync commands: {e}")
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
@@ -1475,35 +2031,98 @@ async def on_message(message: discord.Message):
         return
     if not message.guild:
         return
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, status FROM tickets WHERE channel_id = ?", (message.channel.id,))
-    t = cur.fetchone()
-    if not t or t["status"] == "closed":
-        conn.close()
+    t = _TICKET_CHANNELS.get(message.channel.id)
+    if t is None:
         return
-    attachments = [
-        {
-            "id": a.id,
-            "filename": a.filename,
-            "url": a.url,
-            "size": a.size,
-            "content_type": a.content_type,
-        }
-        for a in message.attachments
-    ]
-    cur.execute(
-        "INSERT INTO messages(ticket_id, discord_message_id, author_id, content, attachments_json, created_at) VALUES (?,?,?,?,?,?)",
-        (t["id"], message.id, message.author.id, message.content, json.dumps(attachments), int(time.time())),
-    )
-    conn.commit()
-    conn.close()
+    if message.attachments:
+        attachments_json = json.dumps(
+            [
+                {
+                    "id": a.id,
+                    "filename": a.filename,
+                    "url": a.url,
+                    "size": a.size,
+                    "content_type": a.content_type,
+                }
+                for a in message.attachments
+            ],
+            separators=_JSON_SEPARATORS,
+            ensure_ascii=False,
+        )
+    else:
+        attachments_json = _EMPTY_JSON_LIST
+    # Discord's own send time; batched rows are written later, so don't stamp them at flush time
+    row = (t[0], message.id, message.author.id, message.content, attachments_json, int(message.created_at.timestamp()))
+    if _MESSAGE_LOG_QUEUE is None:
+        await run_db(insert_messages, [row])
+    else:
+        _MESSAGE_LOG_QUEUE.put_nowait(row)
+
+
+def insert_messages(rows: List[Tuple[Any, ...]]):
+    with pooled_conn() as conn:
+        conn.executemany(_SQL_INSERT_MESSAGE, rows)
+        conn.commit()
+
+
+_MESSAGE_LOG_QUEUE: "Optional[asyncio.Queue[Tuple[Any, ...]]]" = None
+_MESSAGE_LOG_TASK: "Optional[asyncio.Task[None]]" = None
+
+
+async def message_log_flush_loop(q: "asyncio.Queue[Tuple[Any, ...]]"):
+    """Write queued message rows once MESSAGE_LOG_BATCH_SIZE are waiting or
+    MESSAGE_LOG_FLUSH_SECONDS after the first one arrived, whichever comes first.
+    """
+    loop = asyncio.get_running_loop()
+    batch: List[Tuple[Any, ...]] = []
+    try:
+        while True:
+            batch.append(await q.get())
+            deadline = loop.time() + MESSAGE_LOG_FLUSH_SECONDS
+            while len(batch) < MESSAGE_LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(q.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            rows, batch = batch, []
+            try:
+                await run_db(insert_messages, rows)
+            except Exception as e:
+                print(f"Failed to log {len(rows)} ticket message(s): {e}")
+    finally:
+        # Shutdown: write whatever is still buffered
+        while not q.empty():
+            batch.append(q.get_nowait())
+        if batch:
+            try:
+                insert_messages(batch)
+            except Exception:
+                pass
 
 
 @bot.event
 async def setup_hook():
     # Attach admin group
     bot.tree.add_command(admin_group)
+    # Register persistent views for button handling across restarts
+    try:
+        bot.add_view(get_ticket_view())
+        # Also register a PanelView stub so selects on old panels still work
+        # We add a minimal option to satisfy the component structure; options on the message will be used
+        stub_option = discord.SelectOption(label="Select", value="cat:0")
+        bot.add_view(PanelView([stub_option]))
+    except Exception:
+        pass
+    await run_db(warm_pool)
+    # Nothing can be mid-creation before login, so every channel-less ticket row is an orphan
+    await run_db(delete_stale_pending_tickets, 0)
+    await run_db(load_ticket_channels)
+    global _MESSAGE_LOG_QUEUE, _MESSAGE_LOG_TASK
+    _MESSAGE_LOG_QUEUE = asyncio.Queue()
+    _MESSAGE_LOG_TASK = asyncio.create_task(message_log_flush_loop(_MESSAGE_LOG_QUEUE))
 
 
 def main():